@@ -0,0 +1,327 @@
+import os
+import sys
+import numpy as np
+from config import Config
+from data import ResultStore, HEADER_SIZE, THEMES, tail_csv
+
+COLUMNS = {"Total Jump": "jumps", "Score": "score", "Level": "level"}
+SIDECAR_VERSION = 2
+FINGERPRINT_SIZE = 64  # bytes before the saved offset that must still match for a sidecar to be used
+
+
+class RunningStats:
+    def __init__(self, count=0, mean=0.0, m2=0.0, low=np.nan, high=np.nan):
+        """Count, mean, standard deviation, min and max of a stream of values, kept with Welford's method"""
+        self.__count = int(count)
+        self.__mean = float(mean)
+        self.__m2 = float(m2)  # sum of squared differences from the mean
+        self.__min = float(low)
+        self.__max = float(high)
+
+    @staticmethod
+    def of_values(values):
+        """Return the RunningStats of a batch of values"""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return RunningStats()
+        mean = values.mean()
+        return RunningStats(len(values), mean, ((values - mean) ** 2).sum(), values.min(), values.max())
+
+    @staticmethod
+    def of_counts(counts):
+        """Return the RunningStats of integer values given as counts indexed by value"""
+        values = np.flatnonzero(counts)
+        if len(values) == 0:
+            return RunningStats()
+        counts = counts[values]
+        count = counts.sum()
+        mean = (values * counts).sum() / count
+        return RunningStats(count, mean, (counts * (values - mean) ** 2).sum(), values[0], values[-1])
+
+    def add(self, values):
+        """Add a batch of values"""
+        self.merge(RunningStats.of_values(values))
+
+    def merge(self, other):
+        """Fold in the statistics of other values, with the pairwise form of Welford's update"""
+        if other.__count == 0:
+            return
+        count = self.__count + other.__count
+        delta = other.__mean - self.__mean
+        self.__m2 += other.__m2 + delta * delta * self.__count * other.__count / count
+        self.__mean += delta * other.__count / count
+        self.__count = count
+        self.__min = np.fmin(self.__min, other.__min)
+        self.__max = np.fmax(self.__max, other.__max)
+
+    def to_array(self):
+        return np.array([self.__count, self.__mean, self.__m2, self.__min, self.__max])
+
+    @staticmethod
+    def from_array(array):
+        return RunningStats(*array)
+
+    def get_count(self):
+        return self.__count
+
+    def get_mean(self):
+        return self.__mean if self.__count else np.nan
+
+    def get_std(self):
+        """Return the sample standard deviation, like pandas"""
+        return np.sqrt(self.__m2 / (self.__count - 1)) if self.__count > 1 else np.nan
+
+    def get_min(self):
+        return self.__min
+
+    def get_max(self):
+        return self.__max
+
+
+class ResultAggregator:
+    def __init__(self, store=None, csv_path="game_results.csv", sidecar=Config.STATS_FILE, time_step=1.0):
+        """Running statistics of the results history that read only the rows appended since the last update.
+
+        The binary store is followed when there is one, otherwise the CSV. A file that was replaced or
+        truncated is read again from the start. The statistics are saved to the sidecar file every
+        Config.STATS_SAVE_ROWS rows and by save(), so a later session starts from there instead of the raw rows.
+        """
+        self.__store = store if store is not None else ResultStore()
+        self.__csv_path = csv_path
+        self.__sidecar = sidecar
+        self.__unsaved = 0  # rows read since the sidecar was last written
+        self.__time_step = time_step
+        self.__version = 0
+        self.__clear(None, 0)
+
+    def __clear(self, source, offset):
+        self.__source = source  # (path, inode) of the file being followed
+        self.__offset = offset
+        self.__themes = np.zeros(len(THEMES) + 1, dtype=np.int64)  # games per theme code, 0 is unknown
+        self.__stats = {}  # (column, theme code) -> RunningStats
+        self.__counts = {}  # (column, theme code) -> games per integer value
+        self.__level_counts = {}  # (column, level) -> games per integer value, for the columns besides Level
+        self.__cells = {}  # theme code, jumps and time cell packed in one integer -> games
+
+    def update(self):
+        """Read newly appended rows into the statistics, return how many there were"""
+        if self.__store.exists():
+            path, start, read = self.__store.get_path(), HEADER_SIZE, self.__store.tail
+        elif os.path.exists(self.__csv_path):
+            path, start, read = self.__csv_path, 0, lambda offset: tail_csv(self.__csv_path, offset)
+        else:
+            return 0
+
+        status = os.stat(path)
+        source = (path, status.st_ino)
+        if source != self.__source and not self.__resume(source, status.st_size) \
+                or status.st_size < self.__offset:
+            self.__clear(source, start)
+            self.__version += 1
+        if status.st_size == self.__offset:
+            return 0
+
+        records, self.__offset = read(self.__offset)
+        if len(records):
+            self.__add(records)
+            self.__version += 1
+            self.__unsaved += len(records)
+            if self.__unsaved >= Config.STATS_SAVE_ROWS:
+                self.save()
+        return len(records)
+
+    def __fingerprint(self, path, offset):
+        """Return the bytes just before offset, which change if the file was rewritten"""
+        with open(path, "rb") as f:
+            f.seek(max(offset - FINGERPRINT_SIZE, 0))
+            return np.frombuffer(f.read(min(offset, FINGERPRINT_SIZE)), dtype=np.uint8)
+
+    def __resume(self, source, size):
+        """Load the sidecar if it was saved from this results file, return True if it was"""
+        if self.__sidecar is None or not os.path.exists(self.__sidecar):
+            return False
+        try:
+            with np.load(self.__sidecar) as saved:
+                offset = int(saved["offset"])
+                if (str(saved["path"]) != source[0] or int(saved["inode"]) != source[1] or size < offset
+                        or not np.array_equal(saved["fingerprint"], self.__fingerprint(source[0], offset))):
+                    return False
+                self.__clear(source, offset)
+                self.__load_state(saved)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring statistics sidecar {self.__sidecar}: {e}")
+            return False
+        self.__version += 1
+        return True
+
+    def save(self):
+        """Write the statistics and the position reached to the sidecar, replacing it atomically"""
+        if self.__sidecar is None or self.__source is None or not self.__unsaved:
+            return
+        path, inode = self.__source
+        try:
+            with open(self.__sidecar + ".tmp", "wb") as f:
+                np.savez(f, path=path, inode=inode, offset=self.__offset,
+                         fingerprint=self.__fingerprint(path, self.__offset), **self.get_state())
+            os.replace(self.__sidecar + ".tmp", self.__sidecar)
+            self.__unsaved = 0
+        except OSError as e:
+            print(f"Could not save statistics to {self.__sidecar}: {e}")
+
+    def get_state(self):
+        """Return the statistics as a dict of arrays, independent of the file they were read from"""
+        state = {"version": SIDECAR_VERSION, "themes": self.__themes,
+                 "cell_keys": np.fromiter(self.__cells.keys(), dtype=np.int64, count=len(self.__cells)),
+                 "cell_counts": np.fromiter(self.__cells.values(), dtype=np.int64, count=len(self.__cells))}
+        for index, column in enumerate(COLUMNS):
+            for code in range(len(self.__themes)):
+                if (column, code) in self.__stats:
+                    state[f"stats_{index}_{code}"] = self.__stats[(column, code)].to_array()
+                    state[f"counts_{index}_{code}"] = self.__counts[(column, code)]
+        for (column, level), counts in self.__level_counts.items():
+            state[f"level_counts_{list(COLUMNS).index(column)}_{level}"] = counts
+        return state
+
+    def __load_state(self, state):
+        if int(state["version"]) != SIDECAR_VERSION:
+            raise ValueError(f"version {int(state['version'])} is not {SIDECAR_VERSION}")
+        self.__themes = state["themes"].copy()
+        self.__cells = dict(zip(state["cell_keys"].tolist(), state["cell_counts"].tolist()))
+        for index, column in enumerate(COLUMNS):
+            for code in range(len(self.__themes)):
+                if f"stats_{index}_{code}" in state:
+                    self.__stats[(column, code)] = RunningStats.from_array(state[f"stats_{index}_{code}"])
+                    self.__counts[(column, code)] = state[f"counts_{index}_{code}"].copy()
+        for name in state:
+            if name.startswith("level_counts_"):
+                index, level = name[len("level_counts_"):].split("_")
+                self.__level_counts[(list(COLUMNS)[int(index)], int(level))] = state[name].copy()
+
+    def merge(self, state):
+        """Fold in the statistics of another history, such as another machine's sidecar"""
+        other = ResultAggregator(sidecar=None)
+        other.__load_state(state)
+        self.__themes += other.__themes
+        for key, games in other.__cells.items():
+            self.__cells[key] = self.__cells.get(key, 0) + games
+        for key, stats in other.__stats.items():
+            self.__stats.setdefault(key, RunningStats()).merge(stats)
+            self.__add_counts(self.__counts, key, other.__counts[key])
+        for key, counts in other.__level_counts.items():
+            self.__add_counts(self.__level_counts, key, counts)
+        self.__version += 1
+
+    def __add(self, records):
+        """Fold a record array into every statistic, in time proportional to its length"""
+        themes = records["theme"].astype(np.int64)
+        games = np.bincount(themes, minlength=len(self.__themes))
+        self.__themes += games
+        played = np.flatnonzero(games)
+        for column, field in COLUMNS.items():
+            values = records[field].astype(np.int64)
+            width = int(values.max()) + 1
+            counts = np.bincount(themes * width + values, minlength=len(games) * width).reshape(-1, width)
+            for theme in played:
+                self.__stats.setdefault((column, theme), RunningStats()).merge(RunningStats.of_counts(counts[theme]))
+                self.__add_counts(self.__counts, (column, theme), counts[theme])
+
+        levels = records["level"].astype(np.int64)
+        height = int(levels.max()) + 1
+        reached = np.flatnonzero(np.bincount(levels))
+        for column, field in COLUMNS.items():
+            if column == "Level":
+                continue
+            values = records[field].astype(np.int64)
+            width = int(values.max()) + 1
+            counts = np.bincount(levels * width + values, minlength=height * width).reshape(-1, width)
+            for level in reached:
+                self.__add_counts(self.__level_counts, (column, int(level)), counts[level])
+
+        # One sortable key per (theme, jumps, time cell): 8, 24 and 32 bits
+        cells = np.round(records["time"] / self.__time_step).astype(np.int64)
+        keys, counts = np.unique((themes << 56) | (records["jumps"].astype(np.int64) << 32) | cells,
+                                 return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.__cells[key] = self.__cells.get(key, 0) + count
+
+    @staticmethod
+    def __add_counts(table, key, counts):
+        old = table.get(key)
+        if old is not None:
+            if len(old) > len(counts):
+                old, counts = counts, old
+            counts = counts.copy()
+            counts[:len(old)] += old
+        table[key] = counts
+
+    def get_version(self):
+        """Return a number that changes whenever the statistics do"""
+        return self.__version
+
+    def get_count(self):
+        return int(self.__themes.sum())
+
+    def __codes(self, theme):
+        return range(len(self.__themes)) if theme is None else [THEMES.index(theme) + 1]
+
+    def get_stats(self, column, theme=None, level=None):
+        """Return the RunningStats of a CSV column over every game, one theme or one level"""
+        if level is not None:
+            return RunningStats.of_counts(self.__level_counts.get((column, level), np.zeros(0, dtype=np.int64)))
+        stats = RunningStats()
+        for code in self.__codes(theme):
+            if (column, code) in self.__stats:
+                stats.merge(self.__stats[(column, code)])
+        return stats
+
+    def theme_counts(self):
+        """Return [(theme, games)] from the most played theme down, leaving out unplayed themes"""
+        played = [(THEMES[code - 1], int(games)) for code, games in enumerate(self.__themes) if code and games]
+        return sorted(played, key=lambda pair: -pair[1])
+
+    def levels(self):
+        """Return the levels reached, in order"""
+        return sorted({level for _, level in self.__level_counts})
+
+    def value_counts(self, column, theme=None, level=None):
+        """Return (values, games) of a CSV column over every game, one theme or one level, in value order"""
+        if level is not None:
+            arrays = [self.__level_counts[(column, level)]] if (column, level) in self.__level_counts else []
+        else:
+            arrays = [self.__counts[(column, code)] for code in self.__codes(theme)
+                      if (column, code) in self.__counts]
+        counts = np.zeros(max((len(array) for array in arrays), default=0), dtype=np.int64)
+        for array in arrays:
+            counts[:len(array)] += array
+        values = np.flatnonzero(counts)
+        return values, counts[values]
+
+    def histogram(self, column, bins=10):
+        """Return (edges, games) of bins equal-width buckets from the column's min to max, like DataFrame.hist"""
+        values, counts = self.value_counts(column)
+        if not len(values):
+            return np.linspace(0, 1, bins + 1), np.zeros(bins, dtype=np.int64)
+        counts, edges = np.histogram(values, bins=bins, weights=counts)
+        return edges, counts.astype(np.int64)
+
+    def cells(self):
+        """Return {theme: (jumps, time played, games)} with the time rounded to the time step"""
+        by_theme = {}
+        for key, games in self.__cells.items():
+            code, jumps, cell = key >> 56, (key >> 32) & 0xFFFFFF, key & 0xFFFFFFFF
+            if code:
+                by_theme.setdefault(THEMES[code - 1], []).append((jumps, cell * self.__time_step, games))
+        return {theme: tuple(np.array(points).T) for theme, points in sorted(by_theme.items())}
+
+
+if __name__ == '__main__':
+    # Merge the statistics sidecars of several machines and print the combined summary
+    merged = ResultAggregator(sidecar=None)
+    for path in sys.argv[1:]:
+        with np.load(path) as saved:
+            merged.merge(saved)
+    print(f"{merged.get_count()} games in {len(sys.argv) - 1} sidecar(s)")
+    for column in COLUMNS:
+        stats = merged.get_stats(column)
+        print(f"{column:<11} mean {stats.get_mean():9.2f}  std {stats.get_std():9.2f}  "
+              f"min {stats.get_min():7.0f}  max {stats.get_max():7.0f}")
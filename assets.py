@@ -0,0 +1,132 @@
+import time
+from collections import OrderedDict
+import pygame as pg
+from config import Config
+
+
+class AssetManager:
+    __instance = None
+
+    def __init__(self, max_size=Config.ASSET_CACHE_SIZE):
+        if AssetManager.__instance is None:
+            self.__max_size = max_size
+            self.__cache = OrderedDict()  # path -> (surface, is_converted, alpha)
+            self.__timings = {}  # path -> [load_ms, convert_ms]
+            self.__masks = {}  # path -> pg.Mask
+        else:
+            raise Exception("This class is a singleton!")
+
+    @staticmethod
+    def get_instance():
+        if AssetManager.__instance is None:
+            AssetManager.__instance = AssetManager()
+        return AssetManager.__instance
+
+    @staticmethod
+    def __display_ready():
+        return pg.display.get_init() and pg.display.get_surface() is not None
+
+    def __convert(self, path, surface, alpha):
+        """Convert a surface to the display pixel format once"""
+        start = time.perf_counter()
+        surface = surface.convert_alpha() if alpha else surface.convert()
+        self.__timings[path][1] = (time.perf_counter() - start) * 1000
+        return surface
+
+    def image(self, path, alpha=True):
+        """Return the sprite at path, loading and converting it on first use"""
+        if path in self.__cache:
+            surface, is_converted, alpha = self.__cache[path]
+            if not is_converted and self.__display_ready():
+                surface = self.__convert(path, surface, alpha)
+                self.__cache[path] = (surface, True, alpha)
+            self.__cache.move_to_end(path)
+            return surface
+
+        start = time.perf_counter()
+        surface = pg.image.load(path)
+        self.__timings[path] = [(time.perf_counter() - start) * 1000, 0.0]
+
+        is_converted = self.__display_ready()
+        if is_converted:
+            surface = self.__convert(path, surface, alpha)
+
+        self.__cache[path] = (surface, is_converted, alpha)
+        while len(self.__cache) > self.__max_size:
+            self.__cache.popitem(last=False)
+        return surface
+
+    def images(self, paths, alpha=True):
+        """Return a sprite or a list of sprites for a Config path entry"""
+        if isinstance(paths, list):
+            return [self.image(path, alpha) for path in paths]
+        return self.image(paths, alpha)
+
+    def mask(self, path):
+        """Return the collision mask of the sprite at path, building it on first use.
+
+        The padding is the area around the drawing that has the colour of the top-left corner,
+        transparent or the flat background of an opaque sprite. Everything else is solid,
+        including the holes inside an outline drawing.
+        """
+        mask = self.__masks.get(path)
+        if mask is None:
+            surface = self.image(path)
+            mask = pg.mask.from_threshold(surface, surface.get_at((0, 0)), Config.MASK_THRESHOLD)
+            mask = mask.connected_component((0, 0))
+            mask.invert()
+            self.__masks[path] = mask
+        return mask
+
+    def masks(self, paths):
+        """Return a mask or a list of masks for a Config path entry"""
+        if isinstance(paths, list):
+            return [self.mask(path) for path in paths]
+        return self.mask(paths)
+
+    def convert_all(self):
+        """Convert every cached sprite that was loaded before the display existed"""
+        if not self.__display_ready():
+            return
+        for path, (surface, is_converted, alpha) in self.__cache.items():
+            if not is_converted:
+                self.__cache[path] = (self.__convert(path, surface, alpha), True, alpha)
+
+    def load_theme(self, theme):
+        """Load and convert every sprite used by a theme"""
+        self.image(Config.BG[theme], alpha=False)
+        self.images(Config.RUN[theme])
+        self.image(Config.JUMP[theme])
+        self.image(Config.OBSTACLE[theme])
+
+    def evict(self, path):
+        """Remove one sprite and its mask from the cache"""
+        self.__cache.pop(path, None)
+        self.__masks.pop(path, None)
+
+    def evict_theme(self, theme):
+        """Remove every sprite used by a theme from the cache"""
+        paths = [Config.BG[theme], Config.JUMP[theme], Config.OBSTACLE[theme]]
+        run = Config.RUN[theme]
+        paths += run if isinstance(run, list) else [run]
+        for path in paths:
+            self.evict(path)
+
+    def clear(self):
+        """Remove every sprite and mask from the cache"""
+        self.__cache.clear()
+        self.__masks.clear()
+
+    def timings(self):
+        """Return {path: (load_ms, convert_ms)} for every sprite loaded so far"""
+        return {path: tuple(times) for path, times in self.__timings.items()}
+
+    def report(self):
+        """Print load and convert timings for every sprite loaded so far"""
+        total_load = total_convert = 0.0
+        for path, (load_ms, convert_ms) in self.__timings.items():
+            print(f"{path:<22} load {load_ms:6.2f} ms  convert {convert_ms:6.2f} ms")
+            total_load += load_ms
+            total_convert += convert_ms
+        print(f"{'total':<22} load {total_load:6.2f} ms  convert {total_convert:6.2f} ms "
+              f"({len(self.__cache)}/{self.__max_size} cached)")
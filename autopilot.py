@@ -0,0 +1,74 @@
+import random
+import sys
+import time
+from config import Config
+from simulation import Simulation
+
+
+class Autopilot:
+    def __init__(self, rng=None, reaction=(0, 15)):
+        """A scripted player that jumps a random reaction time, in ticks, after the first tick on
+        which a jump would clear the next obstacle; a slow enough reaction misses the window"""
+        self.__random = rng if rng is not None else random.Random(0)
+        self.__reaction = reaction
+        self.__target = None
+        self.__jump_tick = None
+
+    @staticmethod
+    def __ahead(simulation):
+        """Return the obstacles the runner still has to get past, nearest first"""
+        runner_left = simulation.get_runner().get_rect().left
+        return [obstacle for obstacle in simulation.get_obstacles()
+                if not obstacle.has_passed() and obstacle.get_rect().right >= runner_left]
+
+    def decide(self, simulation):
+        """Return True if the jump key should be pressed before the next step"""
+        runner = simulation.get_runner()
+        if runner.is_jumping():
+            return False
+        ahead = self.__ahead(simulation)
+        if not ahead:
+            return False
+        obstacle = ahead[0]
+        if obstacle is not self.__target:
+            self.__target = obstacle
+            self.__jump_tick = None
+
+        ticks = simulation.get_ticks()
+        if self.__jump_tick is None:
+            # A jump pressed while an obstacle is more than a whole jump away lands before reaching it,
+            # and a jump is only worth pressing if it also gets past every obstacle it reaches
+            step = simulation.get_speed() + simulation.get_level()
+            reach = runner.get_rect().right + simulation.get_arc().get_airtime() * step
+            if obstacle.get_x() > reach:
+                return False
+            for other in ahead:
+                if other.get_x() > reach:
+                    break
+                if not simulation.will_clear(other):
+                    return False
+            self.__jump_tick = ticks + self.__random.randint(*self.__reaction)
+        if ticks >= self.__jump_tick:
+            self.__target = None
+            self.__jump_tick = None
+            return True
+        return False
+
+    def play(self, simulation, max_ticks=None):
+        """Play the simulation to the end or to max_ticks and return the result row"""
+        while not simulation.is_over() and (max_ticks is None or simulation.get_ticks() < max_ticks):
+            if self.decide(simulation):
+                simulation.jump()
+            simulation.step()
+        return simulation.result()
+
+
+if __name__ == '__main__':
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    max_ticks = 180 * Config.TICK_RATE
+    start = time.perf_counter()
+    for theme in Config.THEME_ID:
+        times = sorted(Autopilot(random.Random(seed)).play(Simulation(theme, seed), max_ticks)[3]
+                       for seed in range(games))
+        print(f"{theme:<12} median {times[len(times) // 2]:7.2f} s  best {times[-1]:7.2f} s")
+    print(f"{games * len(Config.THEME_ID)} games in {time.perf_counter() - start:.2f} s")
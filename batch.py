@@ -0,0 +1,207 @@
+import time
+import numpy as np
+from config import Config
+from assets import AssetManager
+from trajectory import JumpArc
+
+
+class BatchSimulator:
+    def __init__(self, themes, count=None):
+        """N independent playthroughs of the game rules advanced together with NumPy.
+
+        themes is one theme name for every game or a sequence with one theme name per game.
+        Each game has a single obstacle and collides by bounding boxes, so it matches
+        Simulation(pixel_collision=False) up to Config.OBSTACLE_LEVEL_CAP.
+        """
+        if isinstance(themes, str):
+            themes = [themes] * count
+        self.__themes = np.array(themes)
+        self.__size = len(self.__themes)
+
+        runner_w, runner_h, obstacle_w, obstacle_h = {}, {}, {}, {}
+        assets = AssetManager.get_instance()
+        for theme, theme_id in Config.THEME_ID.items():
+            run = assets.images(Config.RUN[theme_id])
+            run = run[0] if isinstance(run, list) else run  # every animation frame has the same size
+            obstacle = assets.image(Config.OBSTACLE[theme_id])
+            runner_w[theme], runner_h[theme] = run.get_size()
+            obstacle_w[theme], obstacle_h[theme] = obstacle.get_size()
+
+        def per_game(values):
+            return np.array([values[theme] for theme in themes])
+
+        self.__runner_x = per_game({t: p[0] for t, p in Config.POSITION_RUNNER.items()})
+        self.__ground_y = per_game({t: p[1] for t, p in Config.POSITION_RUNNER.items()}).astype(np.float64)
+        self.__runner_w = per_game(runner_w)
+        self.__runner_h = per_game(runner_h)
+        self.__obstacle_y = per_game({t: p[1] for t, p in Config.POSITION_OBSTACLE.items()})
+        self.__obstacle_w = per_game(obstacle_w)
+        self.__obstacle_h = per_game(obstacle_h)
+
+        self.__runner_y = self.__ground_y.copy()
+        self.__velocity = np.zeros(self.__size)
+        self.__is_jumping = np.zeros(self.__size, dtype=bool)
+        self.__obstacle_x = per_game({t: p[0] for t, p in Config.POSITION_OBSTACLE.items()}).astype(np.float64)
+
+        self.__score = np.zeros(self.__size, dtype=np.int64)
+        self.__jump = np.zeros(self.__size, dtype=np.int64)
+        self.__level = np.ones(self.__size, dtype=np.int64)
+        self.__speed = np.full(self.__size, 5.0)
+        self.__gravity = np.full(self.__size, 0.4)
+        self.__has_passed_obstacle = np.zeros(self.__size, dtype=bool)
+        self.__ticks = np.zeros(self.__size, dtype=np.int64)
+        self.__is_over = np.zeros(self.__size, dtype=bool)
+
+    def __len__(self):
+        return self.__size
+
+    def runner_rects(self):
+        """Return (left, top, right, bottom) integer arrays matching Runner.get_rect"""
+        left = self.__runner_x
+        top = self.__runner_y.astype(np.int64)  # pg.Rect truncates toward zero
+        return left, top, left + self.__runner_w, top + self.__runner_h
+
+    def obstacle_rects(self):
+        """Return (left, top, right, bottom) integer arrays matching Obstacle.get_rect"""
+        left = self.__obstacle_x.astype(np.int64)
+        top = self.__obstacle_y
+        return left, top, left + self.__obstacle_w, top + self.__obstacle_h
+
+    def find_dis(self):
+        """Return a mask of games where the runner collides with the obstacle"""
+        r_left, r_top, r_right, r_bottom = self.runner_rects()
+        o_left, o_top, o_right, o_bottom = self.obstacle_rects()
+        return (r_left < o_right) & (o_left < r_right) & (r_top < o_bottom) & (o_top < r_bottom)
+
+    def check_is_on_top(self):
+        """Return a mask of games where the runner lands on top of the obstacle"""
+        r_left, r_top, r_right, r_bottom = self.runner_rects()
+        o_left, o_top, o_right, o_bottom = self.obstacle_rects()
+        return (o_top + 20 < r_bottom) & (r_right > o_left) & (r_left < o_right)
+
+    def will_clear(self):
+        """Return a mask of games where a jump pressed now, from the ground, gets past the obstacle at the
+        current speed, as JumpArc.will_clear does for one game"""
+        x = self.__obstacle_x
+        width = self.__obstacle_w
+        left = self.__runner_x
+        right = left + self.__runner_w
+        step = self.__speed + self.__level
+
+        def obstacle_left(tick):
+            return np.trunc(x - tick * step)
+
+        # The estimates are off by at most one tick of rounding, corrected against the exact test
+        first = np.maximum(1, np.floor((x - right) / step) + 1)
+        first = np.where((first > 1) & (obstacle_left(first - 1) < right), first - 1, first)
+        first = np.where(obstacle_left(first) >= right, first + 1, first)
+        last = np.maximum(first - 1, np.ceil((x + width - left) / step) - 1)
+        last = np.where(obstacle_left(last + 1) + width > left, last + 1, last)
+        last = np.where((last >= first) & (obstacle_left(last) + width <= left), last - 1, last)
+
+        lowest = np.empty(self.__size)
+        arcs, which = np.unique(np.stack([self.__ground_y, self.__gravity], axis=1), axis=0, return_inverse=True)
+        which = which.reshape(-1)
+        for i, (ground_y, gravity) in enumerate(arcs):
+            arc = JumpArc.get(int(ground_y), float(gravity))
+            games = which == i
+            heights = arc.get_height_array()
+            airtime = arc.get_airtime()
+            lowest[games] = np.maximum(heights[np.minimum(first[games], airtime).astype(np.int64)],
+                                       heights[np.minimum(last[games], airtime).astype(np.int64)])
+        return (last < first) | (lowest.astype(np.int64) + self.__runner_h <= self.__obstacle_y)
+
+    def state(self):
+        """Return the per-game state arrays a jump policy decides from"""
+        return {
+            "runner_y": self.__runner_y,
+            "velocity": self.__velocity,
+            "is_jumping": self.__is_jumping,
+            "obstacle_x": self.__obstacle_x,
+            "score": self.__score,
+            "level": self.__level,
+            "speed": self.__speed,
+            "gravity": self.__gravity,
+            "ticks": self.__ticks,
+            "is_over": self.__is_over,
+        }
+
+    def is_over(self):
+        return self.__is_over
+
+    def jump(self, mask):
+        """Press the jump key in every running game where mask is True"""
+        mask = mask & ~self.__is_over
+        self.__jump += mask
+        launch = mask & ~self.__is_jumping
+        self.__is_jumping |= launch
+        self.__velocity[launch] = Config.JUMP_VELOCITY
+
+    def step(self):
+        """Advance every running game by one fixed simulation tick, return the mask of ended games"""
+        alive = ~self.__is_over
+        self.__ticks += alive
+
+        jumping = alive & self.__is_jumping
+        self.__runner_y = np.where(jumping, self.__runner_y + self.__velocity, self.__runner_y)
+        self.__velocity = np.where(jumping, self.__velocity + self.__gravity, self.__velocity)
+        landed = jumping & (self.__runner_y >= self.__ground_y)
+        self.__runner_y[landed] = self.__ground_y[landed]
+        self.__is_jumping[landed] = False
+        self.__velocity[landed] = 0
+
+        self.__obstacle_x = np.where(alive, self.__obstacle_x - (self.__speed + self.__level), self.__obstacle_x)
+        wrapped = self.__obstacle_x < -self.__obstacle_w
+        self.__obstacle_x[wrapped] = Config.GAME_WIDTH
+
+        collided = alive & self.find_dis()
+        self.__is_over |= collided
+
+        scoring = alive & ~collided
+        r_left = self.__runner_x
+        o_right = self.__obstacle_x.astype(np.int64) + self.__obstacle_w
+        passed = scoring & (self.check_is_on_top() | (o_right < r_left))
+        new_pass = passed & ~self.__has_passed_obstacle
+        self.__score += new_pass
+        level_up = new_pass & (self.__score % 10 == 0)
+        ramp = level_up & (self.__level < 7)
+        self.__level += level_up
+        self.__speed = np.where(ramp, self.__speed + 0.5, self.__speed)
+        self.__gravity = np.where(ramp, self.__gravity + 0.04, self.__gravity)
+        self.__has_passed_obstacle = np.where(scoring, passed, self.__has_passed_obstacle)
+
+        return self.__is_over
+
+    def run(self, policy, max_ticks):
+        """Step every game until it ends or reaches max_ticks, pressing jump where policy(state) is True"""
+        for _ in range(max_ticks):
+            if self.__is_over.all():
+                break
+            self.jump(policy(self.state()))
+            self.step()
+        return self.results()
+
+    def results(self):
+        """Return one SaveFile row per game, as Simulation.result does"""
+        times = np.round(self.__ticks / Config.TICK_RATE, 2)
+        # Speed stays the int 5 until the first ramp, as it does in Simulation
+        return [[int(jump), int(score), int(level), float(played), float(speed) if level > 1 else int(speed),
+                 str(theme)]
+                for jump, score, level, played, speed, theme
+                in zip(self.__jump, self.__score, self.__level, times, self.__speed, self.__themes)]
+
+
+if __name__ == '__main__':
+    games = 20000
+    batch = BatchSimulator(list(Config.THEME_ID) * (games // 3 + 1))
+    distance = np.random.default_rng(0).uniform(150, 400, len(batch))
+
+    def policy(state):
+        return state["obstacle_x"] - 20 < distance
+
+    start = time.perf_counter()
+    rows = batch.run(policy, max_ticks=3000)
+    elapsed = time.perf_counter() - start
+    ticks = int(batch.state()["ticks"].sum())
+    print(f"{len(batch)} games, {ticks} ticks in {elapsed:.2f} s ({ticks / elapsed:,.0f} ticks/s), "
+          f"mean score {np.mean([row[1] for row in rows]):.2f}")
@@ -0,0 +1,451 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import numpy as np
+import pygame as pg
+from config import Config
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure(func, repeat=7, budget=0.2):
+    """Return the least wall time of func() in seconds over at least repeat runs, and as many more as fit
+    in budget seconds: the run least disturbed by the rest of the machine"""
+    times = []
+    total = 0.0
+    while len(times) < repeat or total < budget:
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+        total += times[-1]
+    return min(times)
+
+
+def bench_entities(results):
+    from game_component import Runner, Obstacle
+
+    runner = Runner(*Config.POSITION_RUNNER["Escaping F"])
+    obstacle = Obstacle(*Config.POSITION_OBSTACLE["Escaping F"])
+    runner.set_theme(1)
+    obstacle.set_theme(1)
+    count = 100000
+
+    def update_runner():
+        for i in range(count):
+            if i % 60 == 0:
+                runner.jump()
+            runner.update(0.4)
+
+    def update_obstacle():
+        for _ in range(count):
+            obstacle.update(1, 5)
+
+    results["runner_update"] = (count / measure(update_runner), "ops/s", "higher")
+    results["obstacle_update"] = (count / measure(update_obstacle), "ops/s", "higher")
+
+
+def bench_collision(results):
+    from simulation import Simulation
+
+    simulation = Simulation("Escaping F")
+    obstacle = simulation.get_obstacles()[0]
+    count = 100000
+
+    def find_dis():
+        for _ in range(count):
+            simulation.find_dis(obstacle)
+
+    def check_is_on_top():
+        for _ in range(count):
+            simulation.check_is_on_top(obstacle)
+
+    def will_clear():
+        for _ in range(count):
+            simulation.will_clear(obstacle)
+
+    results["find_dis"] = (measure(find_dis) / count * 1e9, "ns/call", "lower")
+    results["check_is_on_top"] = (measure(check_is_on_top) / count * 1e9, "ns/call", "lower")
+    results["will_clear"] = (measure(will_clear) / count * 1e9, "ns/call", "lower")
+
+    # How often the rect broad phase lets a test through to the mask narrow phase in real games
+    tests = broad_hits = 0
+    for seed in range(30):
+        simulation = Simulation(list(Config.THEME_ID)[seed % 3], seed)
+        distance = 150 + seed * 8
+        while not simulation.is_over() and simulation.get_ticks() < 20000:
+            if simulation.get_obstacles()[0].get_rect().x - 20 < distance:
+                simulation.jump()
+            simulation.step()
+        stats = simulation.collision_stats()
+        tests += stats["tests"]
+        broad_hits += stats["broad_hits"]
+    results["broad_phase_hit_rate"] = (broad_hits / tests * 100, "%", "lower")
+
+
+def bench_allocations(results):
+    import tracemalloc
+    from simulation import Simulation
+
+    simulation = Simulation("Escaping F")
+    obstacles = simulation.get_obstacles()
+
+    def play(ticks):
+        for _ in range(ticks):
+            if obstacles[0].get_rect().x < 320:
+                simulation.jump()
+            simulation.step()
+
+    play(200)  # warm up caches and interned values
+    ticks = 1000
+    only_repo = [tracemalloc.Filter(True, os.path.join(ROOT, "*"))]
+    tracemalloc.start()
+    # A state value replaced for the first time while tracing shows up as one new block, so
+    # the least growth over a few windows is what the hot loop itself retains
+    blocks = None
+    snapshot = tracemalloc.take_snapshot().filter_traces(only_repo)
+    for _ in range(3):
+        play(ticks)
+        previous, snapshot = snapshot, tracemalloc.take_snapshot().filter_traces(only_repo)
+        growth = sum(stat.count_diff for stat in snapshot.compare_to(previous, "filename"))
+        blocks = growth if blocks is None else min(blocks, growth)
+
+    peak = 0
+    for _ in range(ticks // 2):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        play(1)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    if simulation.is_over():
+        raise RuntimeError("The allocation benchmark game ended before the measured ticks")
+
+    # A window can end holding fewer state values than it started with; that is not a negative cost
+    results["alloc_blocks_per_tick"] = (max(blocks, 0) / ticks, "blocks", "lower")
+    results["alloc_peak_bytes_per_tick"] = (peak, "bytes", "lower")
+
+
+def bench_drawing(results):
+    from game_component import Runner, Obstacle, Drawer
+
+    drawer = Drawer()
+    drawer.updating()
+    frames = 300
+    for theme, theme_id in Config.THEME_ID.items():
+        drawer.set_theme(theme_id)
+        runner = Runner(*Config.POSITION_RUNNER[theme])
+        obstacle = Obstacle(*Config.POSITION_OBSTACLE[theme])
+        runner.set_theme(theme_id)
+        obstacle.set_theme(theme_id)
+
+        def draw():
+            for i in range(frames):
+                runner.update(0.4)
+                obstacle.update(1, 5)
+                drawer.draw_game(runner, [obstacle], i // 30, 1)
+                drawer.update()
+
+        results[f"draw_game_fps[{theme}]"] = (frames / measure(draw), "fps", "higher")
+
+
+def bench_stress(results):
+    import random
+    from game_component import Runner, Drawer
+    from spawner import ObstacleSpawner
+
+    drawer = Drawer()
+    drawer.updating()
+    drawer.set_theme(1)
+    runner = Runner(*Config.POSITION_RUNNER["Escaping F"])
+    runner.set_theme(1)
+    spawner = ObstacleSpawner("Escaping F", random.Random(0), stress=True)
+    spawner.update(1, 5)
+    frames = 300
+
+    def frame():
+        for i in range(frames):
+            runner.update(0.4)
+            spawner.update(1, 5)
+            spawner.count_near(runner.get_rect().right)
+            drawer.draw_game(runner, spawner.get_active(), i, 1)
+            drawer.update()
+
+    results[f"stress_fps[{len(spawner.get_active())} obstacles]"] = (frames / measure(frame), "fps", "higher")
+
+
+def bench_sound(results):
+    from game import SoundEffects
+
+    def loader(cached):
+        def load():
+            pg.mixer.quit()
+            if not cached:
+                shutil.rmtree(Config.SOUND_CACHE_DIR, ignore_errors=True)
+            SoundEffects._SoundEffects__instance = None
+            SoundEffects.get_instance().load()
+        return load
+
+    # What the first space press costs while the loader thread is still starting the mixer
+    first_play = []
+    for _ in range(9):
+        pg.mixer.quit()
+        SoundEffects._SoundEffects__instance = None
+        sound = SoundEffects.get_instance()
+        start = time.perf_counter()
+        sound.play("start")
+        first_play.append(time.perf_counter() - start)
+        while not sound.is_ready():
+            time.sleep(0.001)
+
+    results["sound_load_synthesised"] = (measure(loader(False), repeat=9) * 1000, "ms", "lower")
+    results["sound_load_cached"] = (measure(loader(True), repeat=9) * 1000, "ms", "lower")
+    results["sound_first_play"] = (statistics.median(first_play) * 1000, "ms", "lower")
+
+
+def synthetic_results(path, rows, seed=0):
+    """Write a results CSV with rows plausible games"""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    jumps = rng.poisson(8, rows)
+    score = np.minimum(jumps, rng.poisson(6, rows))
+    level = 1 + score // 10
+    pd.DataFrame({
+        "Total Jump": jumps,
+        "Score": score,
+        "Level": level,
+        "Time Played": np.round(1.5 + jumps * rng.uniform(0.8, 1.6, rows), 2),
+        "Final Speed": 5 + 0.5 * np.minimum(level - 1, 6),
+        "Theme": rng.choice(list(Config.THEME_ID), rows),
+    }).to_csv(path, index=False)
+
+
+def bench_persistence(results, workdir):
+    from data import SaveFile
+
+    os.chdir(workdir)
+    for path in ("game_results.csv", Config.RESULTS_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+    save_file = SaveFile()
+    count = 500  # fewer than Config.SAVE_QUEUE_SIZE, so every row goes straight to the queue
+    row = [4, 2, 1, 7.4, 5, "Escaping F"]
+
+    # add_data is what a game-over frame pays; the disk write happens on the writer thread. A game
+    # over adds one row to an idle writer, and how a burst of rows interleaves with the writer
+    # thread changes from one process to the next, so each call is timed on its own
+    enqueue = []
+    for _ in range(count):
+        start = time.perf_counter()
+        save_file.add_data(row)
+        enqueue.append(time.perf_counter() - start)
+        save_file.flush()
+
+    def write():
+        for _ in range(count):
+            save_file.add_data(row)
+        save_file.flush()
+
+    results["save_add_data"] = (min(enqueue) * 1e6, "us", "lower")
+    results["save_written"] = (count / measure(write), "rows/s", "higher")
+    save_file.close()
+
+
+def bench_stat(results, workdir, sizes, plots):
+    from data import ResultStore, ResultDatabase
+    from menu import Stat, SqlStat, ChartCache, rasterise
+
+    os.chdir(workdir)
+    repeat = 3  # a breakdown of a million rows in SQLite takes seconds
+    for rows in sizes:
+        for path in (Config.RESULTS_FILE, Config.RESULTS_DB, Config.STATS_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        synthetic_results("game_results.csv", rows)
+
+        def cold_load():
+            if os.path.exists(Config.STATS_FILE):
+                os.remove(Config.STATS_FILE)
+            Stat().refresh()
+
+        results[f"stat_load[{rows}]"] = (measure(cold_load, repeat) * 1000, "ms", "lower")
+        store = ResultStore()
+        store.import_csv()
+        results[f"stat_load_binary[{rows}]"] = (measure(cold_load, repeat) * 1000, "ms", "lower")
+        results[f"stat_load_sidecar[{rows}]"] = (measure(lambda: Stat().refresh(), repeat) * 1000, "ms", "lower")
+        stat = Stat()
+        stat.refresh()
+        game = [[40, 75, 5, 61.5, 7.5, "Escaping F"]]
+        # Every run adds a game, so the run count stays fixed to keep the history near its size
+        results[f"stat_refresh_one_game[{rows}]"] = (measure(lambda: (store.add_rows(game), stat.refresh()), budget=0)
+                                                     * 1000, "ms", "lower")
+        ResultDatabase().import_csv()
+        for prefix, stat in (("stat", stat), ("stat_sql", SqlStat())):
+            results[f"{prefix}_describe[{rows}]"] = (measure(stat.descriptive, repeat) * 1000, "ms", "lower")
+            results[f"{prefix}_breakdown[{rows}]"] = (measure(stat.breakdown, repeat) * 1000, "ms", "lower")
+            if not plots:
+                continue
+            for chart in ("pie_chart", "boxplot", "histogram", "scatter_plot"):
+                def plot():
+                    rasterise(getattr(stat, chart)())
+
+                results[f"{prefix}_{chart}[{rows}]"] = (measure(plot, repeat) * 1000, "ms", "lower")
+
+            charts = ChartCache()
+            key = ("scatter_plot", (8, 6))
+            charts.get(key + (stat.get_version(),), lambda: rasterise(stat.scatter_plot(figure_size=(8, 6))))
+            results[f"{prefix}_chart_cache_hit[{rows}]"] = (
+                measure(lambda: charts.get(key + (stat.get_version(),), None), repeat) * 1000, "ms", "lower")
+
+
+def run_suite(workdir, sizes, plots):
+    """Run every benchmark once and return {name: (value, unit, better)}"""
+    results = {}
+    bench_entities(results)
+    bench_collision(results)
+    bench_allocations(results)
+    bench_drawing(results)
+    bench_stress(results)
+    bench_sound(results)
+    bench_persistence(results, workdir)
+    bench_stat(results, workdir, sizes, plots)
+    return results
+
+
+NOISE_CAP = 0.4  # most spread counted for a result, so with the default tolerance a 2x slowdown always fails
+
+
+def slowdown(value, base, better):
+    """Return how much slower value is than base as a ratio minus one, for times and throughputs alike:
+    twice the time and half the throughput are both +100%"""
+    if better == "lower":
+        return value / base - 1
+    return base / value - 1 if value > 0 else float("inf")
+
+
+def combine(runs):
+    """Return the best of each result over several suite runs and its spread, how much slower the worst run
+    was than the best. Like the repeats within measure, the best run is the one least disturbed by the rest
+    of the machine."""
+    results = {}
+    noise = {}
+    for name, (_, unit, better) in runs[0].items():
+        values = [run[name][0] for run in runs]
+        value = min(values) if better == "lower" else max(values)
+        results[name] = (value, unit, better)
+        noise[name] = max(values) / min(values) - 1 if min(values) > 0 else 0.0
+    return results, noise
+
+
+def compare(results, baseline, tolerance, verbose=True):
+    """Print every result against the baseline, return the names that regressed. Each result may
+    slow down by tolerance plus twice the spread its baseline runs showed, as a few runs understate it.
+    The runs of one result can happen to agree, so no spread counts as less than the upper quartile
+    of all, which a quarter of the results reached in a few runs, nor as more than NOISE_CAP."""
+    regressions = []
+    spreads = sorted(entry.get("noise", 0.0) for entry in baseline.values())
+    floor = spreads[3 * len(spreads) // 4] if spreads else 0.0
+    for name, (value, unit, better) in results.items():
+        if name not in baseline:
+            if verbose:
+                print(f"{name:<32} {value:14.2f} {unit:<8} (no baseline)")
+            continue
+        base = baseline[name]["value"]
+        allowed = tolerance + 2 * min(max(baseline[name].get("noise", 0.0), floor), NOISE_CAP)
+        if base <= 0:
+            change = 0.0
+            worse = better == "lower" and value > 0  # a zero baseline, such as per-tick allocations, must stay zero
+        else:
+            change = slowdown(value, base, better)
+            worse = change > allowed
+        flag = "REGRESSION" if worse else ""
+        if verbose:
+            print(f"{name:<32} {value:14.2f} {unit:<8} baseline {base:14.2f} (slowdown {change:+.1%}, "
+                  f"allowed {allowed:.0%}) {flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmarks for Running to Reality")
+    parser.add_argument("--rows", type=int, nargs="*", default=[1000, 10000, 100000, 1000000],
+                        help="synthetic history sizes for the Stat benchmarks (up to 10000000)")
+    parser.add_argument("--no-plots", action="store_true", help="skip the chart benchmarks")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the results JSON")
+    parser.add_argument("--baseline", default=os.path.join(ROOT, "benchmarks", "baseline.json"),
+                        help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown on top of twice the spread stored with each baseline result")
+    parser.add_argument("--runs", type=int, help="run the suite this many times and keep the best of each "
+                                                 "result (default 3 with --save-baseline, else 1)")
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="extra runs of the suite when a result regressed; it only counts as a regression if "
+                             "the best of every run still is one")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline)
+    baseline = {}
+    if not args.save_baseline and os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)["results"]
+    workdir = tempfile.mkdtemp(prefix="rtr-bench-")
+    shutil.copytree(os.path.join(ROOT, "photo"), os.path.join(workdir, "photo"))
+    os.chdir(workdir)
+
+    try:
+        pg.init()
+        runs = [run_suite(workdir, args.rows, not args.no_plots)
+                for _ in range(args.runs or (3 if args.save_baseline else 1))]
+        results, noise = combine(runs)
+        # This machine's speed can drift for minutes at a time, which a single run cannot tell from a regression
+        for _ in range(0 if args.save_baseline else args.confirm):
+            if not compare(results, baseline, args.tolerance, verbose=False):
+                break
+            print("Some results regressed, running the suite again to confirm")
+            runs.append(run_suite(workdir, args.rows, not args.no_plots))
+            results, noise = combine(runs)
+        pg.quit()
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "pygame": pg.version.ver, "numpy": np.__version__,
+                 "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "runs": len(runs)},
+        "results": {name: {"value": value, "unit": unit, "better": better, "noise": round(noise[name], 3)}
+                    for name, (value, unit, better) in results.items()},
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        shutil.copyfile(output, baseline_path)
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%} beyond their "
+              "baseline spread: " + ", ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,3 @@
-import pygame as pg
-
-
 class Config:
     GAME_WIDTH = 800
     GAME_HEIGHT = 600
@@ -11,14 +8,64 @@ class Config:
     BUTTON_WIDTH = 350
     BUTTON_HEIGHT = 40
 
-    BG = {1: pg.image.load("photo/bg.png"), 2: pg.image.load("photo/bg3.png"),  3: pg.image.load("photo/bg2.png")}
-    RUN = {1: [pg.image.load("photo/run.png"), pg.image.load("photo/run2.png")],
-           2: [pg.image.load("photo/run.png"), pg.image.load("photo/run2.png")],
-           3: pg.image.load("photo/ghost.png")}
-    OBSTACLE = {1: pg.image.load("photo/obstacle.png"), 2: pg.image.load("photo/obstacle3.png"),
-                3: pg.image.load("photo/obstacle2.png")}
-    JUMP = {1: pg.image.load("photo/jump.png"), 2: pg.image.load("photo/jump.png"), 3: pg.image.load("photo/ghost.png")}
-    MENU_BG = pg.image.load('photo/menu.png')
+    BG = {1: "photo/bg.png", 2: "photo/bg3.png", 3: "photo/bg2.png"}
+    RUN = {1: ["photo/run.png", "photo/run2.png"],
+           2: ["photo/run.png", "photo/run2.png"],
+           3: "photo/ghost.png"}
+    OBSTACLE = {1: "photo/obstacle.png", 2: "photo/obstacle3.png", 3: "photo/obstacle2.png"}
+    JUMP = {1: "photo/jump.png", 2: "photo/jump.png", 3: "photo/ghost.png"}
+    MENU_BG = "photo/menu.png"
+
+    ASSET_CACHE_SIZE = 8
+    PIXEL_COLLISION = True  # test sprite masks after the bounding boxes overlap
+    MASK_THRESHOLD = (16, 16, 16, 16)  # how close to the corner colour a padding pixel is
+    TEXT_CACHE_SIZE = 64
+    DIRTY_RECTS = False
+    IDLE_FPS = 15
+
+    TICK_RATE = 60  # fixed simulation steps per second
+    RENDER_FPS = 60  # 0 renders uncapped
+    VSYNC = False
+    MAX_FRAME_TIME = 0.25  # seconds of simulation a single slow frame may catch up
+
+    OBSTACLE_LEVEL_CAP = 7  # one obstacle at a time up to this level
+    MAX_OBSTACLES = 4
+    OBSTACLE_GAP = (100, 450)  # extra pixels between consecutive obstacles on top of one jump's length
+    STRESS_OBSTACLES = 300
+    STRESS_GAP = (2, 6)
+
+    JUMP_VELOCITY = -16  # vertical speed at the start of a jump, in pixels per tick
+
+    SAMPLE_RATE = 44100
+    SOUND_CACHE_DIR = "sound_cache"  # synthesised effects, memory-mapped on later launches
+
+    RESULTS_BACKEND = "binary"  # or "sqlite"
+    RESULTS_FILE = "game_results.bin"  # binary records, the CSV is kept as a copy
+    RESULTS_DB = "game_results.db"
+    STATS_FILE = "game_results.stats.npz"  # running statistics, so the history is not read again
+    STATS_SAVE_ROWS = 1000  # rows read before the statistics file is rewritten, and on exit
+    CHART_CACHE_SIZE = 8  # rendered chart images kept by the statistics window
+    STAT_POLL_MS = 50  # how often the statistics window checks for finished charts
+    SCATTER_MAX_POINTS = 5000  # scatter markers drawn before switching to a density grid
+    DENSITY_BINS = 50  # density grid cells along each axis
+    SCATTER_SAMPLE = 100  # cells per theme sampled over the density grid, 0 for none
+    TABLE_PAGE_ROWS = 100  # statistics table rows put in the widget at a time
+    SAVE_CSV = True
+    SAVE_QUEUE_SIZE = 1024  # result rows waiting for the writer thread
+    SAVE_BATCH_SIZE = 32  # rows written together
+    SAVE_FLUSH_INTERVAL = 1.0  # seconds a row may wait for its batch to fill
+    SAVE_FSYNC = False  # fsync after every batch
+
+    RECORD_REPLAYS = False  # save the inputs of every game to REPLAY_DIR
+    REPLAY_DIR = "replays"
+    REPLAY_KEEP = 100  # newest replays kept, older ones are deleted as new ones are saved
+
+    PROFILE = False  # print sprite load timings at start, F3 toggles the timing overlay at runtime
+    PROFILE_WINDOW = 600  # frames kept for rolling percentiles
+    PROFILE_TRACE_FRAMES = 36000  # latest frames kept for the trace dump, ten minutes at 60 fps
+    PROFILE_DIR = "profiles"
+
+    THEME_ID = {'Escaping F': 1, 'Escaping T': 2, 'Rescuing G': 3}
 
     TEXT_STARTING = {1: 'Escaping F Grade With Me', 3: 'Escaping trap with me', 2: 'Escaping time with me'}
     TEXT_ENDING = {1: 'Sorry, it not enough to pass the exam!', 2: 'There is no time left!', 3: 'You got trapped!'}
@@ -1,15 +1,435 @@
+import atexit
 import csv
+import itertools
 import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import closing
+import numpy as np
+from config import Config
+
+CSV_HEADER = ["Total Jump", "Score", "Level", "Time Played", "Final Speed", "Theme"]
+MAGIC = b"RTRS"
+VERSION = 1
+HEADER_SIZE = 8  # magic, version and padding before the first record
+RESULT_DTYPE = np.dtype([("jumps", "<i4"), ("score", "<i4"), ("level", "<i4"),
+                         ("time", "<f4"), ("speed", "<f4"), ("theme", "u1")])
+THEMES = list(Config.THEME_ID)  # theme code - 1 -> name, code 0 is an unknown theme
+
+
+def result_row(jumps, score, level, played, speed, theme):
+    """Return a stored result as the game's own row holds it, so csv writes it the same: the time a float
+    rounded to 2 places, the speed the starting int until the first level up and a float after it"""
+    speed = round(speed, 2)
+    return [jumps, score, level, round(played, 2), int(speed) if level == 1 and speed.is_integer() else speed, theme]
+
+
+class ResultStore:
+    def __init__(self, path=Config.RESULTS_FILE):
+        """Game results as fixed-width binary records, appended in place and memory-mapped to read"""
+        self.__path = path
+
+    def get_path(self):
+        return self.__path
+
+    def exists(self):
+        return os.path.exists(self.__path)
+
+    @staticmethod
+    def to_records(rows):
+        """Convert SaveFile rows to a record array"""
+        return np.array([(jumps, score, level, played, speed, Config.THEME_ID.get(theme, 0))
+                         for jumps, score, level, played, speed, theme in rows], dtype=RESULT_DTYPE)
+
+    @staticmethod
+    def frame_to_records(frame):
+        """Convert a DataFrame with the CSV columns to a record array"""
+        records = np.empty(len(frame), dtype=RESULT_DTYPE)
+        records["jumps"] = frame["Total Jump"]
+        records["score"] = frame["Score"]
+        records["level"] = frame["Level"]
+        records["time"] = frame["Time Played"]
+        records["speed"] = frame["Final Speed"]
+        records["theme"] = frame["Theme"].map(Config.THEME_ID).fillna(0)
+        return records
+
+    def add_rows(self, rows, played_at=None):
+        """Append SaveFile rows; the binary records have no timestamp"""
+        self.append(self.to_records(rows))
+
+    def append(self, records):
+        """Append a record array, first dropping a partial record left by an interrupted write, and fsync it
+        when Config.SAVE_FSYNC is set"""
+        if not self.exists():
+            with open(self.__path, "wb") as f:
+                f.write(MAGIC + bytes([VERSION]) + bytes(HEADER_SIZE - len(MAGIC) - 1))
+        with open(self.__path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            end = size - (size - HEADER_SIZE) % RESULT_DTYPE.itemsize
+            if end != size:
+                f.truncate(end)
+                f.seek(end)
+            f.write(records.tobytes())
+            if Config.SAVE_FSYNC:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def load(self):
+        """Return every record as a read-only memory map, with no parsing"""
+        with open(self.__path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+            size = f.seek(0, os.SEEK_END)
+        if header[:4] != MAGIC or header[4] != VERSION:
+            raise ValueError(f"{self.__path} is not a Running to Reality results file")
+        count = (size - HEADER_SIZE) // RESULT_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=RESULT_DTYPE)
+        return np.memmap(self.__path, dtype=RESULT_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+    def tail(self, offset=HEADER_SIZE):
+        """Return (the whole records after byte offset, the offset after them), reading nothing before offset"""
+        with open(self.__path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        whole = len(data) - len(data) % RESULT_DTYPE.itemsize
+        return np.frombuffer(data, dtype=RESULT_DTYPE, count=whole // RESULT_DTYPE.itemsize), offset + whole
+
+    @staticmethod
+    def to_dataframe(records):
+        """Return the records as a DataFrame with the CSV column names"""
+        import pandas as pd
+
+        return pd.DataFrame({
+            "Total Jump": records["jumps"],
+            "Score": records["score"],
+            "Level": records["level"],
+            "Time Played": np.round(records["time"].astype(np.float64), 2),
+            "Final Speed": np.round(records["speed"].astype(np.float64), 2),
+            "Theme": pd.Categorical.from_codes(records["theme"].astype(np.int8) - 1, THEMES),
+        })
+
+    def import_csv(self, csv_path="game_results.csv", chunk_rows=1000000):
+        """Replace the store with the rows of a results CSV, return how many were converted"""
+        import pandas as pd
+
+        if self.exists():
+            os.remove(self.__path)
+        self.append(np.empty(0, dtype=RESULT_DTYPE))
+        count = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+            records = self.frame_to_records(chunk)
+            self.append(records)
+            count += len(records)
+        return count
+
+    def export_csv(self, csv_path="game_results.csv"):
+        """Write every record to a results CSV in the format SaveFile writes, return how many"""
+        records = self.load()
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            for jumps, score, level, played, speed, theme in records.tolist():
+                writer.writerow(result_row(jumps, score, level, played, speed, THEMES[theme - 1] if theme else ""))
+        return len(records)
+
+
+class ResultDatabase:
+    COLUMNS = {"Total Jump": "jumps", "Score": "score", "Level": "level",
+               "Time Played": "time_played", "Final Speed": "final_speed", "Theme": "theme"}
+    GROUPS = {"Theme": "theme", "Level": "level", "Day": "date(played_at, 'unixepoch', 'localtime')"}
+
+    def __init__(self, path=Config.RESULTS_DB):
+        """Game results in SQLite, so statistics are aggregated by queries instead of in memory"""
+        self.__path = path
+
+    def get_path(self):
+        return self.__path
+
+    def exists(self):
+        return os.path.exists(self.__path)
+
+    def connect(self):
+        """Open a connection for the calling thread, creating the schema on first use"""
+        connection = sqlite3.connect(self.__path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(f"PRAGMA synchronous={'FULL' if Config.SAVE_FSYNC else 'NORMAL'}")
+        connection.execute("""CREATE TABLE IF NOT EXISTS results (
+                                  id INTEGER PRIMARY KEY,
+                                  played_at REAL,
+                                  jumps INTEGER NOT NULL,
+                                  score INTEGER NOT NULL,
+                                  level INTEGER NOT NULL,
+                                  time_played REAL NOT NULL,
+                                  final_speed REAL NOT NULL,
+                                  theme TEXT NOT NULL)""")
+        connection.execute("CREATE INDEX IF NOT EXISTS results_theme ON results (theme)")
+        connection.execute("CREATE INDEX IF NOT EXISTS results_played_at ON results (played_at)")
+        return connection
+
+    def add_rows(self, rows, played_at=None):
+        """Insert SaveFile rows in one transaction; played_at holds a Unix time per row, or None"""
+        if played_at is None:
+            played_at = [None] * len(rows)
+        with closing(self.connect()) as connection, connection:
+            connection.executemany("INSERT INTO results (played_at, jumps, score, level, time_played, final_speed, "
+                                   "theme) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                   [(when, *row) for when, row in zip(played_at, rows)])
+
+    def import_csv(self, csv_path="game_results.csv", chunk_rows=100000):
+        """Replace the table with the rows of a results CSV, which have no timestamps, return how many"""
+        with closing(self.connect()) as connection, connection:
+            connection.execute("DELETE FROM results")
+        count = 0
+        with open(csv_path, newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            while True:
+                rows = [(int(jumps), int(score), int(level), float(played), float(speed), theme)
+                        for jumps, score, level, played, speed, theme in itertools.islice(reader, chunk_rows)]
+                if not rows:
+                    break
+                self.add_rows(rows)
+                count += len(rows)
+        return count
+
+    def export_csv(self, csv_path="game_results.csv"):
+        """Write every row to a results CSV in the format SaveFile writes, return how many"""
+        count = 0
+        with closing(self.connect()) as connection, open(csv_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            for row in connection.execute(
+                    "SELECT jumps, score, level, time_played, final_speed, theme FROM results ORDER BY id"):
+                writer.writerow(result_row(*row))
+                count += 1
+        return count
+
+    def query(self, sql, parameters=()):
+        """Run a read query and return every row it produces"""
+        with closing(self.connect()) as connection:
+            return connection.execute(sql, parameters).fetchall()
+
+    def count(self):
+        return self.query("SELECT COUNT(*) FROM results")[0][0]
+
+    def theme_counts(self):
+        """Return [(theme, games)] from the most played theme down"""
+        return self.query("SELECT theme, COUNT(*) AS games FROM results GROUP BY theme ORDER BY games DESC")
+
+    def theme_summary(self, column):
+        """Return [(theme, count, min, max, avg)] of a CSV column"""
+        name = self.COLUMNS[column]
+        return self.query(f"SELECT theme, COUNT(*), MIN({name}), MAX({name}), AVG({name}) FROM results "
+                          "GROUP BY theme ORDER BY theme")
+
+    @staticmethod
+    def __where(theme):
+        return ("WHERE theme = ?", (theme,)) if theme is not None else ("", ())
+
+    def summary(self, column, theme=None):
+        """Return (count, min, max, avg, sum of squares) of a CSV column over every game or over one theme"""
+        name = self.COLUMNS[column]
+        where, parameters = self.__where(theme)
+        return self.query(f"SELECT COUNT({name}), MIN({name}), MAX({name}), AVG({name}), "
+                          f"SUM(CAST({name} AS REAL) * {name}) FROM results {where}", parameters)[0]
+
+    def value_counts(self, column, by_theme=False, theme=None):
+        """Return [(value, count)], or [(theme, value, count)], in value order, optionally of one theme"""
+        name = self.COLUMNS[column]
+        if by_theme:
+            return self.query(f"SELECT theme, {name}, COUNT(*) FROM results GROUP BY theme, {name} "
+                              f"ORDER BY theme, {name}")
+        where, parameters = self.__where(theme)
+        return self.query(f"SELECT {name}, COUNT(*) FROM results {where} GROUP BY {name} ORDER BY {name}",
+                          parameters)
+
+    def grouped_value_counts(self, column, group):
+        """Return [(group value, value, count)] of a CSV column for one of GROUPS, in group then value order,
+        leaving out rows without a group value, such as imported rows for the day"""
+        name, expression = self.COLUMNS[column], self.GROUPS[group]
+        return self.query(f"SELECT {expression} AS grp, {name}, COUNT(*) FROM results WHERE {expression} IS NOT NULL "
+                          f"GROUP BY grp, {name} ORDER BY grp, {name}")
+
+    def histogram(self, column, bins=10):
+        """Return (edges, counts) of bins equal-width buckets from the column's min to max, last edge included"""
+        name = self.COLUMNS[column]
+        low, high = self.query(f"SELECT MIN({name}), MAX({name}) FROM results")[0]
+        if low is None:
+            return np.linspace(0, 1, bins + 1), np.zeros(bins, dtype=np.int64)
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        counts = np.zeros(bins, dtype=np.int64)
+        for bucket, games in self.query(f"SELECT MIN(CAST(({name} - ?) * ? / ? AS INTEGER), ?) AS bucket, "
+                                        f"COUNT(*) FROM results GROUP BY bucket",
+                                        (low, bins, float(high - low), bins - 1)):
+            counts[bucket] = games
+        return np.linspace(low, high, bins + 1), counts
+
+    def binned_pairs(self, x_column, y_column, y_step=1.0):
+        """Return [(theme, x, y, count)] with y rounded to multiples of y_step, one row per occupied cell"""
+        x, y = self.COLUMNS[x_column], self.COLUMNS[y_column]
+        return self.query(f"SELECT theme, {x}, ROUND({y} / ?) * ? AS cell, COUNT(*) FROM results "
+                          f"GROUP BY theme, {x}, cell", (y_step, y_step))
+
+
+def tail_csv(csv_path="game_results.csv", offset=0):
+    """Return (the whole lines of a results CSV after byte offset as records, the offset after them)"""
+    import io
+    import pandas as pd
+
+    with open(csv_path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    whole = data.rfind(b"\n") + 1
+    if whole == 0:
+        return np.empty(0, dtype=RESULT_DTYPE), offset
+    frame = pd.read_csv(io.BytesIO(data[:whole]), names=CSV_HEADER, header=0 if offset == 0 else None)
+    return ResultStore.frame_to_records(frame), offset + whole
+
+
+def open_results():
+    """Return the results backend chosen by Config.RESULTS_BACKEND"""
+    if Config.RESULTS_BACKEND == "sqlite":
+        return ResultDatabase()
+    return ResultStore()
 
 
 class SaveFile:
-    def __init__(self):
-        if not os.path.exists("game_results.csv"):
+    __open_files = []
+    __CLOSE = object()
+
+    def __init__(self, store=None):
+        self.__store = store if store is not None else open_results()
+        if not self.__store.exists() and os.path.exists("game_results.csv"):
+            print(f"Converted {self.__store.import_csv()} saved results to {self.__store.get_path()}")
+        if Config.SAVE_CSV and not os.path.exists("game_results.csv"):
             with open("game_results.csv", "w", newline="") as f:
                 self.__writer = csv.writer(f)
-                self.__writer.writerow(["Total Jump", "Score", "Level", "Time Played", "Final Speed", "Theme"])
+                self.__writer.writerow(CSV_HEADER)
+        self.__queue = queue.Queue(maxsize=Config.SAVE_QUEUE_SIZE)
+        self.__overflow = deque()  # rows the full queue could not take yet, kept by the caller's thread
+        self.__thread = None
+
+    def __start(self):
+        if self.__thread is None or not self.__thread.is_alive():
+            self.__thread = threading.Thread(target=self.__write_loop, name="result-writer", daemon=True)
+            self.__thread.start()
+            SaveFile.__open_files.append(self)
 
     def add_data(self, game_list: list):
-        with open("game_results.csv", "a", newline="") as f:
-            self.__writer = csv.writer(f)
-            self.__writer.writerow(game_list)
+        """Queue a result row for the writer thread, never waiting for the disk"""
+        self.__start()
+        self.__overflow.append((list(game_list), time.time()))
+        while self.__overflow:
+            try:
+                self.__queue.put_nowait(self.__overflow[0])
+            except queue.Full:
+                if len(self.__overflow) == 1:
+                    print("Result writer is behind, keeping new rows in memory until it catches up")
+                return
+            self.__overflow.popleft()
+
+    def flush(self):
+        """Block until every row added so far is written"""
+        if self.__thread is None or not self.__thread.is_alive():
+            return
+        done = threading.Event()
+        while self.__overflow:
+            self.__queue.put(self.__overflow.popleft())
+        self.__queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Write every pending row and stop the writer thread"""
+        if self.__thread is None or not self.__thread.is_alive():
+            return
+        while self.__overflow:
+            self.__queue.put(self.__overflow.popleft())
+        self.__queue.put(SaveFile.__CLOSE)
+        self.__thread.join()
+        if self in SaveFile.__open_files:
+            SaveFile.__open_files.remove(self)
+
+    @staticmethod
+    def close_all():
+        """Close every SaveFile that still has a writer thread, as on shutdown"""
+        for save_file in list(SaveFile.__open_files):
+            save_file.close()
+
+    def __write(self, items):
+        """Add a batch of (row, played_at) to the results store, then the CSV copy, return True once the
+        store has them"""
+        rows = [row for row, _ in items]
+        try:
+            self.__store.add_rows(rows, [played_at for _, played_at in items])
+        except (OSError, sqlite3.Error) as e:
+            print(f"Could not save {len(rows)} result(s): {e}")
+            return False
+        if Config.SAVE_CSV:
+            try:
+                with open("game_results.csv", "a", newline="") as f:
+                    csv.writer(f).writerows(rows)
+                    if Config.SAVE_FSYNC:
+                        f.flush()
+                        os.fsync(f.fileno())
+            except OSError as e:
+                print(f"Could not add {len(rows)} result(s) to the CSV copy: {e}")
+        return True
+
+    def __write_loop(self):
+        """Collect rows into batches and write one when it is full, old enough, flushed or closed"""
+        pending = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if pending else None
+            try:
+                item = self.__queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is SaveFile.__CLOSE:
+                if pending and not self.__write(pending):
+                    print(f"{len(pending)} result(s) were not saved")
+                return
+            if isinstance(item, threading.Event):
+                if pending and self.__write(pending):
+                    pending = []
+                item.set()
+                continue
+            if item is not None:
+                if not pending:
+                    deadline = time.monotonic() + Config.SAVE_FLUSH_INTERVAL
+                pending.append(item)
+
+            if len(pending) >= Config.SAVE_BATCH_SIZE or (pending and time.monotonic() >= deadline):
+                if self.__write(pending):
+                    pending = []
+                else:
+                    deadline = time.monotonic() + Config.SAVE_FLUSH_INTERVAL  # retry later
+
+
+atexit.register(SaveFile.close_all)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in ("import", "export"):
+        print("usage: python data.py import|export [CSV_FILE] [RESULTS_FILE.bin|RESULTS_FILE.db]")
+        sys.exit(1)
+
+    csv_path = sys.argv[2] if len(sys.argv) > 2 else "game_results.csv"
+    if len(sys.argv) > 3:
+        store = ResultDatabase(sys.argv[3]) if sys.argv[3].endswith(".db") else ResultStore(sys.argv[3])
+    else:
+        store = open_results()
+    start = time.perf_counter()
+    if sys.argv[1] == "import":
+        count = store.import_csv(csv_path)
+        print(f"{count} results converted from {csv_path} to {store.get_path()}", end="")
+    else:
+        count = store.export_csv(csv_path)
+        print(f"{count} results exported from {store.get_path()} to {csv_path}", end="")
+    print(f" in {time.perf_counter() - start:.2f} s")
@@ -1,22 +1,26 @@
-import time
+import os
+import random
+import threading
 import pygame as pg
 import numpy as np
 from data import SaveFile
 from config import Config
-from game_component import Runner, Obstacle, Drawer, SelectedMenu
+from assets import AssetManager
+from game_component import Drawer, SelectedMenu
+from simulation import Simulation
+from replay import Replay, new_replay_path
+from profiler import FrameProfiler
 
 
 class SoundEffects:
     __instance = None
+    EFFECTS = {"jump": (0.15, 500), "start": (0.15, 1200), "over": (1.0, 200)}  # name -> (duration, frequency)
 
     def __init__(self):
         if SoundEffects.__instance is None:
-            pg.mixer.init(frequency=44100, channels=2)
-            self.__instance = self
-            self.__effects = {"jump": self.__gen_sound(0.15, 500),
-                              "start": self.__gen_sound(0.15, 1200),
-                              "over": self.__gen_sound(1.0, 200),
-                              }
+            self.__effects = {}
+            self.__ready = threading.Event()
+            self.__loader = None
         else:
             raise Exception("This class is a singleton!")
 
@@ -26,176 +30,192 @@ class SoundEffects:
             SoundEffects.__instance = SoundEffects()
         return SoundEffects.__instance
 
+    def start(self):
+        """Initialise the mixer and load the effects on a background thread, once per mixer: pg.quit() closes it
+        after every game, so effects loaded before that are dropped and loaded again"""
+        if self.__ready.is_set() and not pg.mixer.get_init():
+            self.__effects = {}
+            self.__ready = threading.Event()
+            self.__loader = None
+        if self.__loader is None:
+            self.__loader = threading.Thread(target=self.load, name="sound-loader", daemon=True)
+            self.__loader.start()
+
+    def load(self):
+        """Initialise the mixer and load every effect, synthesising only the ones missing from the cache"""
+        try:
+            if not pg.mixer.get_init():
+                pg.mixer.init(frequency=Config.SAMPLE_RATE, channels=2)
+            self.__effects = {name: pg.sndarray.make_sound(self.samples(duration, f))
+                              for name, (duration, f) in self.EFFECTS.items()}
+        except pg.error as e:
+            print(f"Sound disabled: {e}")
+            return
+        self.__ready.set()
+
+    def is_ready(self):
+        return self.__ready.is_set()
+
+    @staticmethod
+    def samples(duration, f, sample_rate=Config.SAMPLE_RATE):
+        """Return the stereo samples of a tone, memory-mapped from the cache once it has been synthesised"""
+        path = os.path.join(Config.SOUND_CACHE_DIR, f"{duration}-{f}-{sample_rate}.npy")
+        try:
+            return np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            pass
+
+        samples = SoundEffects.synthesise(duration, f, sample_rate)
+        try:
+            os.makedirs(Config.SOUND_CACHE_DIR, exist_ok=True)
+            with open(path + ".tmp", "wb") as file:
+                np.save(file, samples)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(f"Could not cache {path}: {e}")
+        return samples
+
     @staticmethod
-    def __gen_sound(duration, f, sample_rate=44100):
-        t = np.arange(0, duration, 1 / sample_rate)  # x-axis
-        wave = np.sin(2 * np.pi * f * t)  # y-axis
+    def synthesise(duration, f, sample_rate=Config.SAMPLE_RATE):
+        """Return a sine tone as (samples, 2) int16, computed in place in preallocated buffers"""
+        wave = np.arange(int(duration * sample_rate), dtype=np.float64)  # x-axis
+        wave *= 2 * np.pi * f / sample_rate
+        np.sin(wave, out=wave)  # y-axis
 
         bit = 16
-        amp = 2 ** (bit - 1) - 1  # 2^15 - 1 = 32767 output range [-32767,32767]
-        wave = amp * wave
-        two_ch_wave = np.vstack([wave, wave]).reshape(-1, 2).astype(np.int16)
-        sound = pg.sndarray.make_sound(two_ch_wave)
-        return sound
+        wave *= 2 ** (bit - 1) - 1  # 2^15 - 1 = 32767 output range [-32767,32767]
+        two_ch_wave = np.empty((len(wave), 2), dtype=np.int16)
+        two_ch_wave[:, 0] = wave  # one frame per row, the same sample on the left and right channel
+        two_ch_wave[:, 1] = wave
+        return two_ch_wave
 
     def play(self, effect):
+        """Play an effect, or nothing while the mixer is still starting or has been closed"""
+        if not self.__ready.is_set() or not pg.mixer.get_init():
+            self.start()
+            return
         if effect in self.__effects:
             self.__effects[effect].play()
 
 
 class Game:
     def __init__(self):
-        self.__runner = None
-        self.__obstacle = None
-        self.__score = 0
-        self.__jump = 0
-        self.__level = 1
-        self.__speed = 5
+        self.__simulation = None
+        self.__replay = None
         self.__state = "starting"
-        self.__has_passed_obstacle = False
         self.__drawer = Drawer()
-        self.__start_time = None
         self.__save_file = SaveFile()
-        self.__data = []
         self.__theme = "Escaping F"
         self.__menu = SelectedMenu()
-        self.__gravity = 0.4
+        self.__profiler = FrameProfiler()
 
     def set_theme(self, theme):
         """Set the game theme from the Tkinter menu"""
         self.__theme = theme
 
-    def find_dis(self):
-        """Check if the runner collides with the obstacle."""
-        return self.__runner.get_rect().colliderect(self.__obstacle.get_rect())
-
-    def check_is_on_top(self):
-        """Check if the runner lands on top of the obstacle."""
-        runner_rect = self.__runner.get_rect()
-        obs_rect = self.__obstacle.get_rect()
-
-        is_above = obs_rect.top + 20 < runner_rect.bottom
-        is_within_x_range = (runner_rect.right > obs_rect.left) and (runner_rect.left < obs_rect.right)
-
-        return is_above and is_within_x_range
-
     def reset_game(self):
         """Reset the game."""
         print("Restarting Game...")
-        self.__runner = Runner(Config.POSITION_RUNNER[self.__theme][0], Config.POSITION_RUNNER[self.__theme][1])
-        self.__obstacle = Obstacle(Config.POSITION_OBSTACLE[self.__theme][0], Config.POSITION_OBSTACLE[self.__theme][1])
-        self.__score = 0
-        self.__level = 1
-        self.__jump = 0
-        self.__speed = 5
-        self.__gravity = 0.4
+        self.__new_simulation()
         self.__state = "starting"
-        self.__has_passed_obstacle = False
-        self.__start_time = None
-        self.__data = []
-
-        if self.__theme == "Escaping F":
-            self.__drawer.set_theme(1)
-            self.__obstacle.set_theme(1)
-            self.__runner.set_theme(1)
-        elif self.__theme == "Rescuing G":
-            self.__drawer.set_theme(3)
-            self.__obstacle.set_theme(3)
-            self.__runner.set_theme(3)
-        else:  # "Escaping T"
-            self.__drawer.set_theme(2)
-            self.__obstacle.set_theme(2)
-            self.__runner.set_theme(2)
+        self.__drawer.set_theme(Config.THEME_ID[self.__theme])
+
+    def __new_simulation(self):
+        """Start a fresh simulation and replay recording with a new seed."""
+        seed = random.randrange(2 ** 32)
+        self.__simulation = Simulation(self.__theme, seed)
+        self.__replay = Replay(self.__theme, seed)
 
     def run(self):
         """game logic"""
-        pg.init()
+        pg.display.init()  # the mixer is started by SoundEffects, off the main thread
+        pg.font.init()
         self.__drawer.updating()
-        self.__runner = Runner(Config.POSITION_RUNNER[self.__theme][0], Config.POSITION_RUNNER[self.__theme][1])
-        self.__obstacle = Obstacle(Config.POSITION_OBSTACLE[self.__theme][0], Config.POSITION_OBSTACLE[self.__theme][1])
-
-        # Apply theme
-        if self.__theme == "Escaping F":
-            self.__drawer.set_theme(1)
-            self.__obstacle.set_theme(1)
-            self.__runner.set_theme(1)
-        elif self.__theme == "Rescuing G":
-            self.__drawer.set_theme(3)
-            self.__obstacle.set_theme(3)
-            self.__runner.set_theme(3)
-        else:
-            self.__drawer.set_theme(2)
-            self.__obstacle.set_theme(2)
-            self.__runner.set_theme(2)
-
-        running = True
-        while running:
-            for ev in pg.event.get():
-                if ev.type == pg.QUIT:
-                    return
-                elif ev.type == pg.KEYDOWN:
-                    if ev.key == pg.K_SPACE:
-                        if self.__state == "starting":
-                            self.__state = "playing"
-                            self.__start_time = time.time()
-                            SoundEffects.get_instance().play('start')
-                            print("Game started!")
-                        elif self.__state == "playing":
-                            SoundEffects.get_instance().play('jump')
-                            self.__jump += 1
-                            self.__runner.jump()
-                        elif self.__state == "game over":
-                            self.reset_game()
-                    elif ev.key == pg.K_ESCAPE:
+        SoundEffects.get_instance().start()
+        self.__new_simulation()
+        self.__drawer.set_theme(Config.THEME_ID[self.__theme])
+        if Config.PROFILE:
+            AssetManager.get_instance().report()
+
+        tick_time = 1 / Config.TICK_RATE
+        accumulator = 0.0
+        self.__drawer.tick(0)
+
+        try:
+            running = True
+            while running:
+                self.__profiler.begin_frame()
+                for ev in pg.event.get():
+                    if ev.type == pg.QUIT:
                         return
+                    elif ev.type == pg.WINDOWEXPOSED:
+                        self.__drawer.invalidate()
+                    elif ev.type == pg.KEYDOWN:
+                        if ev.key == pg.K_SPACE:
+                            if self.__state == "starting":
+                                self.__state = "playing"
+                                accumulator = 0.0
+                                SoundEffects.get_instance().play('start')
+                                print("Game started!")
+                            elif self.__state == "playing":
+                                SoundEffects.get_instance().play('jump')
+                                self.__replay.record_jump(self.__simulation.get_ticks())
+                                self.__simulation.jump()
+                            elif self.__state == "game over":
+                                self.reset_game()
+                        elif ev.key == pg.K_F3:
+                            self.__profiler.toggle_overlay()
+                            self.__drawer.invalidate()
+                        elif ev.key == pg.K_ESCAPE:
+                            return
+                self.__profiler.mark()
+
+                playing = self.__state == "playing"
+                if playing:
+                    while accumulator >= tick_time and self.__state == "playing":
+                        if self.__simulation.step():
+                            self.__game_over()
+                        accumulator -= tick_time
+                self.__profiler.mark()
+
+                if self.__state == "starting":
+                    self.__drawer.drawing_start()
+                elif playing:
+                    alpha = accumulator / tick_time if self.__state == "playing" else 1.0
+                    self.__drawer.draw_game(self.__simulation.get_runner(), self.__simulation.get_obstacles(),
+                                            self.__simulation.get_score(), self.__simulation.get_level(), alpha)
+                    if self.__profiler.is_overlay_shown():
+                        self.__drawer.draw_overlay(self.__profiler.overlay_lines())
+                elif self.__state == "game over":
+                    self.__drawer.drawing_game_over(self.__simulation.get_score())
+                self.__profiler.mark()
 
-            if self.__state == "starting":
-                self.__drawer.drawing_start()
                 self.__drawer.update()
-            elif self.__state == "playing":
-                self.__runner.update(self.__gravity)
-                self.__obstacle.update(self.__level, self.__speed)
-
-                if self.find_dis():
-                    elapsed_time = time.time() - self.__start_time
-                    print(f"Game Over! You survived for {elapsed_time:.2f} seconds.")
-                    self.__state = "game over"
-                    SoundEffects.get_instance().play('over')
-                    self.__data.append(self.__jump)
-                    self.__data.append(self.__score)
-                    self.__data.append(self.__level)
-                    self.__data.append(round(elapsed_time, 2))
-                    self.__data.append(self.__speed)
-                    self.__data.append(self.__theme)
-                    self.__save_file.add_data(self.__data)
-
-                elif (self.check_is_on_top()
-                      or self.__obstacle.get_rect().right < self.__runner.get_rect().left):
-                    if not self.__has_passed_obstacle:
-                        self.__score += 1
-                        if self.__score % 10 == 0 and self.__score != 0:
-                            if self.__level >= 7:
-                                self.__level += 1
-                                self.__has_passed_obstacle = True
-
-                            else:
-                                self.__level += 1
-                                self.__speed += 0.5
-                                self.__gravity += 0.04
-                                self.__has_passed_obstacle = True
-                        self.__has_passed_obstacle = True
-                else:
-                    self.__has_passed_obstacle = False
+                self.__profiler.mark()
 
-                self.__drawer.draw_game(self.__runner, self.__obstacle, self.__score, self.__level)
-            elif self.__state == "game over":
-                self.__drawer.drawing_game_over(self.__score)
-
-            self.__drawer.update()
-            self.__drawer.tick(60)
+                idle = self.__drawer.is_idle()
+                if idle:
+                    self.__drawer.tick(Config.IDLE_FPS)
+                else:
+                    frame_ms = self.__drawer.tick(Config.RENDER_FPS)
+                    accumulator += min(frame_ms / 1000, Config.MAX_FRAME_TIME)
+                self.__profiler.mark()
+                self.__profiler.end_frame(idle)
+        finally:
+            self.__save_file.close()
+            self.__profiler.dump()
 
         pg.quit()
 
+    def __game_over(self):
+        """End the game and save its results."""
+        print(f"Game Over! You survived for {self.__simulation.elapsed_time():.2f} seconds.")
+        self.__state = "game over"
+        SoundEffects.get_instance().play('over')
+        self.__save_file.add_data(self.__simulation.result())
+        if Config.RECORD_REPLAYS:
+            self.__replay.save(new_replay_path())
+
 
 if __name__ == '__main__':
     game = Game()
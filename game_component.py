@@ -1,179 +1,349 @@
 import pygame as pg
 from config import Config
+from assets import AssetManager
+from text_cache import TextCache
+from trajectory import JumpArc
 
 
 class Runner:
+    __slots__ = ("__x", "__y", "__previous_y", "__ground_y", "__velocity", "__heights", "__arc_gravity",
+                 "__airtime", "__jump_tick", "__runner_images", "__jump_image", "__runner_masks", "__jump_mask",
+                 "__is_animated", "__is_jumping", "__runner_index", "__frame_count", "__theme", "__rect")
+
     def __init__(self, x, y):
         self.__x = x
         self.__y = y
+        self.__previous_y = y
         self.__ground_y = y
         self.__velocity = 0
+        self.__heights = None
+        self.__arc_gravity = 0
+        self.__airtime = 0
+        self.__jump_tick = 0
         self.__runner_images = None
         self.__jump_image = None
+        self.__runner_masks = None
+        self.__jump_mask = None
+        self.__is_animated = False
         self.__is_jumping = False
         self.__runner_index = 0
         self.__frame_count = 0
         self.__theme = None
+        self.__rect = pg.Rect(x, y, 0, 0)
 
     def set_theme(self, theme):
         """ set the selected theme"""
         self.__theme = theme
-        self.__runner_images = Config.RUN[self.__theme]
-        self.__jump_image = Config.JUMP[self.__theme]
+        assets = AssetManager.get_instance()
+        self.__runner_images = assets.images(Config.RUN[self.__theme])
+        self.__jump_image = assets.image(Config.JUMP[self.__theme])
+        self.__runner_masks = assets.masks(Config.RUN[self.__theme])
+        self.__jump_mask = assets.mask(Config.JUMP[self.__theme])
+        self.__is_animated = isinstance(self.__runner_images, list)
+        self.__runner_index = 0
+        self.__rect.size = self.__current_image().get_size()
+
+    def __current_image(self):
+        if self.__is_animated:
+            return self.__runner_images[self.__runner_index]
+        return self.__runner_images
 
     def update(self, gravity):
-        """Update runner's animation and jumping logic using projectile motion."""
-        if isinstance(self.__runner_images, list):
-            self.__frame_count += 1
+        """Update runner's animation and jumping logic by stepping along the precomputed jump arc."""
+        self.__previous_y = self.__y
+        if self.__is_animated:
+            self.__frame_count = (self.__frame_count + 1) % 10
 
             if not self.__is_jumping:
-                if self.__frame_count % 10 == 0:
+                if self.__frame_count == 0:
                     self.__runner_index = (self.__runner_index + 1) % len(self.__runner_images)
+                    self.__rect.size = self.__runner_images[self.__runner_index].get_size()
 
         if self.__is_jumping:
-            self.__y += self.__velocity
-            self.__velocity += gravity
+            if self.__jump_tick == 0:
+                arc = JumpArc.get(self.__ground_y, gravity)
+                self.__heights = arc.get_heights()
+                self.__arc_gravity = gravity
+                self.__airtime = arc.get_airtime()
+            elif self.__heights is not None and gravity != self.__arc_gravity:
+                # Gravity changed mid-jump, so integrate the rest of it from where the table left off
+                self.__velocity = JumpArc.get(self.__ground_y, self.__arc_gravity).get_velocity(self.__jump_tick)
+                self.__heights = None
+            self.__jump_tick += 1
+
+            if self.__heights is not None:
+                self.__y = self.__heights[self.__jump_tick]
+                landed = self.__jump_tick == self.__airtime
+            else:
+                self.__y += self.__velocity
+                self.__velocity += gravity
+                landed = self.__y >= self.__ground_y
 
-            if self.__y >= self.__ground_y:
+            if landed:
                 self.__y = self.__ground_y
                 self.__is_jumping = False
                 self.__velocity = 0
-
-    def draw(self, screen):
-        """Draw the runner on the screen."""
+                self.__heights = None
+                self.__jump_tick = 0
+            self.__rect.y = int(self.__y)  # truncate like the pg.Rect constructor
+
+    def draw(self, screen, alpha=1.0):
+        """Draw the runner on the screen, interpolated alpha of the way from the previous
+        update, and return the area drawn."""
+        y = self.__previous_y + (self.__y - self.__previous_y) * alpha
         if self.__is_jumping:
-            screen.blit(self.__jump_image, (self.__x, self.__y))
-        else:
-            if isinstance(self.__runner_images, list):
-                screen.blit(self.__runner_images[self.__runner_index], (self.__x, self.__y))
-            else:
-                screen.blit(self.__runner_images, (self.__x, self.__y))
+            return screen.blit(self.__jump_image, (self.__x, y))
+        return screen.blit(self.__current_image(), (self.__x, y))
 
     def jump(self):
         """Trigger a projectile-like jump."""
         if not self.__is_jumping:
             self.__is_jumping = True
-            self.__velocity = -16
+            self.__velocity = Config.JUMP_VELOCITY
+
+    def is_jumping(self):
+        return self.__is_jumping
 
     def get_rect(self):
-        """Return the rectangle for collision detection."""
-        if isinstance(self.__runner_images, list):
-            return pg.Rect(self.__x, self.__y, self.__runner_images[self.__runner_index].get_width(),
-                           self.__runner_images[self.__runner_index].get_height())
-        return pg.Rect(self.__x, self.__y, self.__runner_images.get_width(),
-                       self.__runner_images.get_height())
+        """Return the rectangle for collision detection, owned and updated in place by the runner."""
+        return self.__rect
+
+    def get_mask(self):
+        """Return the collision mask of the sprite being drawn, aligned with the rect's top left."""
+        if self.__is_jumping:
+            return self.__jump_mask
+        if self.__is_animated:
+            return self.__runner_masks[self.__runner_index]
+        return self.__runner_masks
 
 
 class Obstacle:
+    __slots__ = ("__x", "__previous_x", "__y", "__obstacle", "__mask", "__width", "__reset_flag", "__has_passed",
+                 "__theme", "__rect")
+
     def __init__(self, x, y):
         self.__x = x
+        self.__previous_x = x
         self.__y = y
         self.__obstacle = None
+        self.__mask = None
+        self.__width = 0
         self.__reset_flag = False
+        self.__has_passed = False
         self.__theme = None
+        self.__rect = pg.Rect(x, y, 0, 0)
 
     def set_theme(self, theme):
         """set the selected theme"""
         self.__theme = theme
-        self.__obstacle = Config.OBSTACLE[self.__theme]
-
-    def draw(self, screen):
-        """Draw the obstacle on the screen."""
-        screen.blit(self.__obstacle, (self.__x, self.__y))
+        assets = AssetManager.get_instance()
+        self.__obstacle = assets.image(Config.OBSTACLE[self.__theme])
+        self.__mask = assets.mask(Config.OBSTACLE[self.__theme])
+        self.__width = self.__obstacle.get_width()
+        self.__rect.size = self.__obstacle.get_size()
+
+    def draw(self, screen, alpha=1.0):
+        """Draw the obstacle on the screen, interpolated alpha of the way from the previous
+        update, and return the area drawn."""
+        x = self.__previous_x + (self.__x - self.__previous_x) * alpha
+        return screen.blit(self.__obstacle, (x, self.__y))
 
     def update(self, level, speed):
         """Update the obstacle's position."""
+        self.__previous_x = self.__x
         self.__x -= (speed + level)
-        if self.__x < - self.__obstacle.get_width():
+        if self.__x < - self.__width:
             self.__x = Config.GAME_WIDTH
+            self.__previous_x = self.__x
             self.__reset_flag = True
         else:
             self.__reset_flag = False
+        self.__rect.x = int(self.__x)  # truncate like the pg.Rect constructor
+
+    def place(self, x):
+        """Move the obstacle to x without interpolating, as a newly spawned obstacle."""
+        self.__x = x
+        self.__previous_x = x
+        self.__rect.x = int(x)
+        self.__reset_flag = False
+        self.__has_passed = False
+
+    def get_x(self):
+        """Return the exact position, which the rect truncates to whole pixels."""
+        return self.__x
+
+    def is_reset(self):
+        """Return True when the last update moved the obstacle back to the right edge."""
+        return self.__reset_flag
+
+    def has_passed(self):
+        return self.__has_passed
+
+    def set_passed(self, has_passed):
+        self.__has_passed = has_passed
 
     def get_rect(self):
-        """Return the obstacle's position."""
-        return pg.Rect(self.__x, self.__y, self.__obstacle.get_width(), self.__obstacle.get_height())
+        """Return the obstacle's position, owned and updated in place by the obstacle."""
+        return self.__rect
+
+    def get_mask(self):
+        """Return the collision mask of the obstacle, aligned with the rect's top left."""
+        return self.__mask
 
 
 class Drawer:
-    def __init__(self):
-        pg.init()
+    def __init__(self, dirty_rects=Config.DIRTY_RECTS):
+        pg.display.init()
+        pg.font.init()
         self.__screen = pg.display.set_mode((Config.GAME_WIDTH, Config.GAME_HEIGHT))
         self.__bg = None
         self.__clock = pg.time.Clock()
         self.__showing = pg.Surface((Config.GAME_WIDTH, Config.GAME_HEIGHT), pg.SRCALPHA)
         self.__theme = None
+        self.__text = TextCache()
+        self.__dirty_rects = dirty_rects
+        self.__mode = None
+        self.__full_flip = True
+        self.__previous_rects = []
+        self.__current_rects = []
+        self.__start_screens = {}
+        self.__game_over_key = None
+        self.__game_over_screen = None
 
     def set_theme(self, theme):
         """set the selected theme"""
         self.__theme = theme
-        self.__bg = Config.BG[self.__theme]
-
-    def draw_game(self, runner, obstacle, score, level):
-        """Draw the game screen."""
-
-        self.__screen.blit(self.__bg, (0, 0))
-        runner.draw(self.__screen)
-        obstacle.draw(self.__screen)
-
-        font = pg.font.Font(None, 36)
-        score_text = font.render(f"Score: {score}", True, Config.BLACK)
-        self.__screen.blit(score_text, (10, 10))
-
-        level_text = font.render(f"Level: {level}", True, Config.BLACK)
-        self.__screen.blit(level_text, (10, 40))
-
-    def drawing_start(self):
-        """Draw the start screen"""
-        self.__screen.fill(Config.WHITE)
-
-        font = pg.font.Font(None, 48)
-        line1_text = font.render(Config.TEXT_STARTING[self.__theme], True, (0, 0, 0))
-        line2_text = font.render("Press Space Bar to Begin the journey!", True, (0, 0, 0))
+        self.__bg = AssetManager.get_instance().image(Config.BG[self.__theme], alpha=False)
+        self.__full_flip = True
+
+    def __begin(self, mode):
+        """Record the screen being drawn, return True when the whole screen must be redrawn"""
+        if mode != self.__mode:
+            self.__mode = mode
+            self.__full_flip = True
+        return self.__full_flip
+
+    def invalidate(self):
+        """Force the next frame to redraw and present the whole screen"""
+        self.__full_flip = True
+
+    def draw_game(self, runner, obstacles, score, level, alpha=1.0):
+        """Draw the game screen, interpolating entities alpha of the way between updates."""
+        if self.__begin("playing") or not self.__dirty_rects:
+            self.__screen.blit(self.__bg, (0, 0))
+        else:
+            for rect in self.__previous_rects:
+                self.__screen.blit(self.__bg, rect, rect)
+
+        self.__current_rects = [runner.draw(self.__screen, alpha)]
+        for obstacle in obstacles:  # sorted by x, so the rest are off screen too
+            if obstacle.get_rect().left >= Config.GAME_WIDTH:
+                break
+            self.__current_rects.append(obstacle.draw(self.__screen, alpha))
+        self.__current_rects.append(
+            self.__text.draw_value(self.__screen, "Score: ", score, (10, 10), 36, Config.BLACK))
+        self.__current_rects.append(
+            self.__text.draw_value(self.__screen, "Level: ", level, (10, 40), 36, Config.BLACK))
+
+    def draw_overlay(self, lines):
+        """Draw text lines in the top right corner over the game screen."""
+        for i, line in enumerate(lines):
+            text = self.__text.render(line, 24, Config.BLACK)
+            rect = text.get_rect(topright=(Config.GAME_WIDTH - 10, 10 + i * 20))
+            self.__current_rects.append(self.__screen.blit(text, rect))
+
+    def __bake_start(self):
+        """Composite the start screen of the current theme once"""
+        screen = pg.Surface((Config.GAME_WIDTH, Config.GAME_HEIGHT)).convert()
+        screen.fill(Config.WHITE)
+
+        line1_text = self.__text.render(Config.TEXT_STARTING[self.__theme], 48, Config.BLACK)
+        line2_text = self.__text.render("Press Space Bar to Begin the journey!", 48, Config.BLACK)
 
         rect1 = line1_text.get_rect(center=(Config.GAME_WIDTH // 2, (Config.GAME_HEIGHT // 2) - 60))
         rect2 = line2_text.get_rect(center=(Config.GAME_WIDTH // 2, Config.GAME_HEIGHT // 2))
 
-        self.__screen.blit(line1_text, rect1)
-        self.__screen.blit(line2_text, rect2)
+        screen.blit(line1_text, rect1)
+        screen.blit(line2_text, rect2)
+        return screen
 
-    def drawing_game_over(self, score):
-        """Draw the game over screen"""
-        transparent_surface = pg.Surface((Config.GAME_WIDTH, Config.GAME_HEIGHT), pg.SRCALPHA)
-        transparent_surface.fill((255, 255, 255, 128))
+    def __bake_game_over(self, score):
+        """Composite the game over overlay of the current theme and score once"""
+        self.__showing.fill((255, 255, 255, 128))
 
-        font = pg.font.Font(None, 48)
-        line1_text = font.render(f"Your total score is {score}", True, (0, 0, 0))
-        line2_text = font.render(f"{Config.TEXT_ENDING[self.__theme]}", True, (0, 0, 0))
-        line3_text = font.render("Press Space bar to restart", True, (0, 0, 0))
+        line1_text = self.__text.render(f"Your total score is {score}", 48, Config.BLACK)
+        line2_text = self.__text.render(Config.TEXT_ENDING[self.__theme], 48, Config.BLACK)
+        line3_text = self.__text.render("Press Space bar to restart", 48, Config.BLACK)
 
         rect1 = line1_text.get_rect(center=(Config.GAME_WIDTH // 2, (Config.GAME_HEIGHT // 2) - 60))
         rect2 = line2_text.get_rect(center=(Config.GAME_WIDTH // 2, Config.GAME_HEIGHT // 2))
         rect3 = line3_text.get_rect(center=(Config.GAME_WIDTH // 2, (Config.GAME_HEIGHT // 2) + 60))
 
-        transparent_surface.blit(line1_text, rect1)
-        transparent_surface.blit(line2_text, rect2)
-        transparent_surface.blit(line3_text, rect3)
+        self.__showing.blit(line1_text, rect1)
+        self.__showing.blit(line2_text, rect2)
+        self.__showing.blit(line3_text, rect3)
 
-        self.__screen.blit(transparent_surface, (0, 0))
+    def drawing_start(self):
+        """Draw the start screen, only when it is not already on the display"""
+        if not self.__begin("starting"):
+            return
+        if self.__theme not in self.__start_screens:
+            self.__start_screens[self.__theme] = self.__bake_start()
+        self.__screen.blit(self.__start_screens[self.__theme], (0, 0))
 
-    def updating(self):
-        self.__screen = pg.display.set_mode((Config.GAME_WIDTH, Config.GAME_HEIGHT))
+    def drawing_game_over(self, score):
+        """Draw the game over screen, only when it is not already on the display"""
+        entering = self.__mode != "game over"
+        if not self.__begin("game over"):
+            return
+        if entering:
+            if self.__game_over_key != (self.__theme, score):
+                self.__game_over_key = (self.__theme, score)
+                self.__bake_game_over(score)
+            self.__screen.blit(self.__showing, (0, 0))
+            self.__game_over_screen = self.__screen.copy()
+        else:
+            self.__screen.blit(self.__game_over_screen, (0, 0))
+
+    def is_idle(self):
+        """Return True when a static screen is already on the display"""
+        return self.__mode != "playing" and not self.__full_flip
 
-    @staticmethod
-    def update():
-        """Update the display."""
-        pg.display.update()
+    def updating(self):
+        if Config.VSYNC:
+            try:
+                self.__screen = pg.display.set_mode((Config.GAME_WIDTH, Config.GAME_HEIGHT), pg.SCALED, vsync=1)
+            except pg.error:
+                self.__screen = pg.display.set_mode((Config.GAME_WIDTH, Config.GAME_HEIGHT))
+        else:
+            self.__screen = pg.display.set_mode((Config.GAME_WIDTH, Config.GAME_HEIGHT))
+        AssetManager.get_instance().convert_all()
+        self.__full_flip = True
+
+    def update(self):
+        """Update the display, pushing only what changed since the last frame."""
+        if self.__full_flip:
+            pg.display.update()
+            self.__full_flip = False
+        elif self.__mode == "playing":
+            if not self.__dirty_rects:
+                pg.display.update()
+            elif self.__current_rects:
+                pg.display.update(self.__previous_rects + self.__current_rects)
+
+        if self.__current_rects:
+            self.__previous_rects = self.__current_rects
+            self.__current_rects = []
 
     def tick(self, fps):
-        """Control the frame rate."""
-        self.__clock.tick(fps)
+        """Control the frame rate, return the milliseconds since the previous tick."""
+        return self.__clock.tick(fps)
 
 
 class SelectedMenu:
     def __init__(self):
         self.__screen = pg.display.set_mode((Config.MENU_WIDTH, Config.MENU_HEIGHT))
-        self.__menu = Config.MENU_BG
+        self.__menu = AssetManager.get_instance().image(Config.MENU_BG, alpha=False)
         self.__buttons = {
             "Escaping F": pg.Rect(140, 320, Config.BUTTON_WIDTH, Config.BUTTON_HEIGHT),
             "Escaping T": pg.Rect(140, 427, Config.BUTTON_WIDTH, Config.BUTTON_HEIGHT),
@@ -181,6 +351,7 @@ class SelectedMenu:
         }
 
         self.selected_theme = None
+        self.__text = TextCache()
 
     def handle_events(self, event):
         """Detect button clicks and update theme selection."""
@@ -193,10 +364,9 @@ class SelectedMenu:
     def draw_menu(self):
         """draw the menu and button"""
         self.__screen.blit(self.__menu, (0, 0))
-        font = pg.font.Font(None, 46)
 
         for theme, rect in self.__buttons.items():
             pg.draw.rect(self.__screen, Config.WHITE, rect)
-            text = font.render(theme, True, Config.BLACK)
+            text = self.__text.render(theme, 46, Config.BLACK)
             text_rect = text.get_rect(center=rect.center)
             self.__screen.blit(text, text_rect)
@@ -1,74 +1,494 @@
+import itertools
+import threading
 import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+from contextlib import closing
 from tkinter import font, ttk
 from game import Game
+from data import SaveFile, ResultStore, ResultDatabase, THEMES
+from aggregator import ResultAggregator
 import pygame as pg
 from game_component import SelectedMenu
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import seaborn as sns
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from config import Config
 
 
-class Stat:
+BREAKDOWN_COLUMNS = ["Group", "Value", "Column", "count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+def quantile_from_counts(values, counts, q):
+    """Return the q quantile, interpolated like pandas, of data given as sorted values and their counts"""
+    cumulative = np.cumsum(counts)
+    position = q * (cumulative[-1] - 1)
+    lower = values[np.searchsorted(cumulative, np.floor(position), side="right")]
+    upper = values[np.searchsorted(cumulative, np.ceil(position), side="right")]
+    return lower + (upper - lower) * (position - np.floor(position))
+
+
+def box_stats(label, values, counts):
+    """Return the ax.bxp statistics of data given as sorted values and their counts, with 1.5 IQR whiskers"""
+    values, counts = np.asarray(values), np.asarray(counts)
+    q1, median, q3 = (quantile_from_counts(values, counts, q) for q in (0.25, 0.5, 0.75))
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    inside = values[(values >= low) & (values <= high)]
+    return {"label": label, "med": median, "q1": q1, "q3": q3,
+            "whislo": inside.min(), "whishi": inside.max(),
+            "fliers": values[(values < low) | (values > high)]}
+
+
+def describe_row(count, mean, std, low, high, values, counts):
+    """Return one DataFrame.describe column from running statistics and value counts"""
+    if not count:
+        return [0] + [np.nan] * 7
+    return [count, mean, std, low] + [quantile_from_counts(values, counts, q) for q in (0.25, 0.5, 0.75)] + [high]
+
+
+def describe_table(table):
+    """Return {column: describe_row} as a DataFrame shaped like DataFrame.describe"""
+    return pd.DataFrame(table, index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"], dtype=float)
+
+
+def draw_pie_chart(theme_counts, figure_size):
+    """Draw the theme distribution from [(theme, games)]"""
+    themes, counts = zip(*theme_counts) if theme_counts else ((), ())
+    fig = Figure(figsize=figure_size)
+    ax = fig.add_subplot()
+    slices, texts, numbers = ax.pie(counts,
+                                    colors=Config.PALETTE,
+                                    labels=themes,
+                                    startangle=90, counterclock=False,
+                                    autopct='%1.2f%%',
+                                    textprops={'color': 'w'})
+    ax.set_title('Selected Theme')
+    ax.legend(slices, themes, title="Themes", bbox_to_anchor=(1, 1))
+    return fig
+
+
+def draw_boxplot(stats, figure_size):
+    """Draw scores by theme from a box_stats per theme"""
+    fig = Figure(figsize=figure_size)
+    ax = fig.add_subplot()
+    boxes = ax.bxp(stats, vert=False, patch_artist=True)["boxes"] if stats else []
+    for box, colour in zip(boxes, Config.PALETTE):
+        box.set_facecolor(colour)
+    ax.set_yticks([])
+    ax.set_xlabel('Score')
+    ax.legend(boxes, [s["label"] for s in stats], title="Theme")
+    ax.set_title('Score by Theme')
+    return fig
+
+
+def draw_histogram(edges, counts, figure_size):
+    """Draw the total jumps distribution from bucket edges and counts"""
+    fig = Figure(figsize=figure_size)
+    ax = fig.add_subplot()
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge", color=Config.PALETTE[0])
+    ax.grid(True)
+    ax.set_title('Distribution of Total Jumps')
+    return fig
+
+
+def density_grid(cells, bins=Config.DENSITY_BINS):
+    """Return (games per grid cell, x edges, y edges) of {theme: (jumps, time played, games)} over every theme"""
+    jumps, played, games = (np.concatenate(column) for column in zip(*cells.values()))
+    return np.histogram2d(jumps, played, bins=bins, weights=games)
+
+
+def stratified_sample(cells, per_theme, rng):
+    """Return {theme: (jumps, time played)} of up to per_theme cells per theme, drawn in proportion to their games"""
+    sample = {}
+    for theme, (jumps, played, games) in cells.items():
+        picked = rng.choice(len(jumps), size=min(per_theme, len(jumps)), replace=False, p=games / games.sum())
+        sample[theme] = (jumps[picked], played[picked])
+    return sample
+
+
+def draw_scatter_plot(cells, figure_size):
+    """Draw jumps vs time played from {theme: (jumps, time played, games)}.
+
+    Up to Config.SCATTER_MAX_POINTS occupied cells are drawn as markers sized by their games. Beyond
+    that the cells are binned into a density grid, overlaid with a sample of each theme's cells, so the
+    drawing time depends on the number of bins instead of the number of games.
+    """
+    fig = Figure(figsize=figure_size)
+    ax = fig.add_subplot()
+    if sum(len(jumps) for jumps, _, _ in cells.values()) <= Config.SCATTER_MAX_POINTS:
+        most = max((games.max() for _, _, games in cells.values()), default=1)
+        for (theme, (jumps, played, games)), colour in zip(cells.items(), Config.PALETTE):
+            ax.scatter(jumps, played, s=10 + 90 * games / most, color=colour, label=theme)
+    else:
+        grid, x_edges, y_edges = density_grid(cells)
+        mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(grid, 0).T, cmap="Greys", norm=LogNorm())
+        fig.colorbar(mesh, ax=ax, label="Games")
+        sample = stratified_sample(cells, Config.SCATTER_SAMPLE, np.random.default_rng(0))
+        for (theme, (jumps, played)), colour in zip(sample.items(), Config.PALETTE):
+            ax.scatter(jumps, played, s=16, color=colour, edgecolors="black", linewidths=0.4, label=theme)
+    ax.set_xlabel("Total Jump")
+    ax.set_ylabel("Time Played")
+    if cells:
+        ax.legend(title="Theme")
+    ax.set_title('Relationship between Jumps and Time Played')
+    return fig
+
+
+def describe_counts(values, counts):
+    """Return a describe_row computed exactly from sorted values and their counts"""
+    values, counts = np.asarray(values, dtype=np.float64), np.asarray(counts)
+    count = counts.sum()
+    mean = (values * counts).sum() / count
+    std = np.sqrt((counts * (values - mean) ** 2).sum() / (count - 1)) if count > 1 else np.nan
+    return describe_row(count, mean, std, values[0], values[-1], values, counts)
+
+
+def sort_key(value):
+    """Order numbers before text, so a column of levels and theme names can be sorted"""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return 0, value, ""
+    return 1, 0, str(value)
+
+
+def format_cell(value):
+    if isinstance(value, (float, np.floating)):
+        return "" if np.isnan(value) else f"{value:.2f}"
+    return str(value)
+
+
+def rasterise(fig):
+    """Draw a figure with Agg into a binary PPM image, which tk.PhotoImage reads directly"""
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    rgba = np.asarray(canvas.buffer_rgba())
+    height, width = rgba.shape[:2]
+    return b"P6 %d %d 255\n" % (width, height) + rgba[..., :3].tobytes()
+
+
+class ChartCache:
+    def __init__(self, max_size=Config.CHART_CACHE_SIZE):
+        """Rendered charts keyed by (chart, figure size, data version), least recently used evicted first"""
+        self.__max_size = max_size
+        self.__images = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get(self, key, render):
+        """Return the image cached under key, calling render() to make it on a miss"""
+        if key in self.__images:
+            self.__hits += 1
+            self.__images.move_to_end(key)
+            return self.__images[key]
+
+        self.__misses += 1
+        image = render()
+        self.__images[key] = image
+        while len(self.__images) > self.__max_size:
+            self.__images.popitem(last=False)
+        return image
+
+    def clear(self):
+        self.__images.clear()
+
+    def stats(self):
+        """Return (hits, misses, images cached)"""
+        return self.__hits, self.__misses, len(self.__images)
+
+
+class StatJob:
     def __init__(self):
-        """Initialize with game data from CSV"""
-        self.__df = pd.read_csv('game_results.csv')
+        """A statistics task for the worker thread that can be cancelled before or while it runs"""
+        self.__cancelled = threading.Event()
+        self.__future = None
+
+    def start(self, executor, func, *args):
+        self.__future = executor.submit(self.__run, func, *args)
+        return self
+
+    def __run(self, func, *args):
+        if self.__cancelled.is_set():
+            raise CancelledError()
+        return func(self, *args)
+
+    def cancel(self):
+        self.__cancelled.set()
+        self.__future.cancel()
+
+    def is_cancelled(self):
+        return self.__cancelled.is_set()
+
+    def done(self):
+        return self.__future.done()
+
+    def result(self):
+        """Return the result, raising CancelledError or the task's exception"""
+        return self.__future.result()
+
+
+class StatWorker:
+    def __init__(self, stat, charts=None):
+        """Runs statistics and chart rendering on one background thread, which alone uses stat and the
+        chart cache, so the Tk main loop never waits for them"""
+        self.__stat = stat
+        self.__charts = charts if charts is not None else ChartCache()
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stat")
+
+    def chart(self, chart, figure_size=(8, 6)):
+        """Start rendering a chart, the job's result is PPM image data"""
+        return StatJob().start(self.__executor, self.__chart, chart, figure_size)
+
+    def __chart(self, job, chart, figure_size):
+        key = (chart, figure_size, self.__stat.get_version())
+
+        def render():
+            fig = getattr(self.__stat, chart)(figure_size=figure_size)
+            if job.is_cancelled():
+                raise CancelledError()
+            return rasterise(fig)
+
+        return self.__charts.get(key, render)
+
+    def descriptive(self):
+        """Start computing the descriptive statistics, the job's result is a DataFrame"""
+        return StatJob().start(self.__executor, lambda job: self.__stat.descriptive())
+
+    def breakdown(self):
+        """Start computing the statistics per group, the job's result is a DataFrame"""
+        return StatJob().start(self.__executor, lambda job: self.__stat.breakdown())
+
+    def sort(self, table, column, ascending):
+        """Start sorting a DataFrame by one column, the job's result is the sorted DataFrame"""
+        return StatJob().start(self.__executor, lambda job: table.sort_values(
+            column, ascending=ascending, kind="stable", ignore_index=True,
+            key=lambda values: values.map(sort_key) if values.dtype == object else values))
+
+    def close(self):
+        """Drop queued jobs, wait for the running one and save the statistics"""
+        self.__executor.shutdown(wait=True, cancel_futures=True)
+        self.__stat.close()
+
+
+class Stat:
+    def __init__(self, aggregator=None):
+        """Statistics served from running aggregates that only read the games saved since they were last used"""
+        self.__aggregator = aggregator if aggregator is not None else ResultAggregator()
+
+    def refresh(self):
+        """Read the games saved since the last call, return how many"""
+        return self.__aggregator.update()
+
+    def get_aggregator(self):
+        return self.__aggregator
+
+    def get_version(self):
+        """Return a number that changes whenever a chart would, after reading new games"""
+        self.refresh()
+        return self.__aggregator.get_version()
+
+    def close(self):
+        """Save the running aggregates, so the next session does not read these games again"""
+        self.__aggregator.save()
 
     def pie_chart(self, figure_size=(5, 4)):
         """Create a pie chart of theme distribution"""
-        pie_df = self.__df.copy()
-        theme_counts = pie_df['Theme'].value_counts()
-        color_arr = Config.PALETTE
-
-        fig, ax = plt.subplots(figsize=figure_size)
-        slices, texts, numbers = ax.pie(theme_counts,
-                                        colors=color_arr,
-                                        labels=theme_counts.index,
-                                        startangle=90, counterclock=False,
-                                        autopct='%1.2f%%',
-                                        textprops={'color': 'w'})
-        ax.set_title('Selected Theme')
-        ax.legend(slices,
-                  theme_counts.index,
-                  title="Themes",
-                  bbox_to_anchor=(1, 1))
-        return fig
+        self.refresh()
+        return draw_pie_chart(self.__aggregator.theme_counts(), figure_size)
 
     def boxplot(self, figure_size=(5, 4)):
         """Create a boxplot of scores by theme"""
-        fig, ax = plt.subplots(figsize=figure_size)
-        sns.boxplot(x='Score', hue='Theme', data=self.__df, palette=Config.PALETTE, ax=ax)
-        plt.title('Score by Theme')
-        return fig
+        self.refresh()
+        stats = []
+        for theme in THEMES:
+            values, counts = self.__aggregator.value_counts('Score', theme)
+            if len(values):
+                stats.append(box_stats(theme, values, counts))
+        return draw_boxplot(stats, figure_size)
 
     def histogram(self, figure_size=(5, 4)):
         """Create a histogram of total jumps"""
-        fig, ax = plt.subplots(figsize=figure_size)
-        self.__df['Total Jump'].hist(color=Config.PALETTE[0], ax=ax)
-        plt.title('Distribution of Total Jumps')
-        return fig
+        self.refresh()
+        return draw_histogram(*self.__aggregator.histogram('Total Jump'), figure_size)
 
     def scatter_plot(self, figure_size=(5, 4)):
         """Create a scatter plot of jumps vs time played"""
-        fig, ax = plt.subplots(figsize=figure_size)
-        sns.scatterplot(data=self.__df,
-                        x="Total Jump",
-                        y="Time Played",
-                        hue="Theme",
-                        palette=Config.PALETTE,
-                        ax=ax)
-        plt.title('Relationship between Jumps and Time Played')
-        return fig
+        self.refresh()
+        return draw_scatter_plot(self.__aggregator.cells(), figure_size)
+
+    def descriptive(self, theme=None):
+        """Get descriptive statistics for selected columns, over every game or over one theme"""
+        self.refresh()
+        table = {}
+        for column in ['Total Jump', 'Score', 'Level']:
+            stats = self.__aggregator.get_stats(column, theme)
+            table[column] = describe_row(stats.get_count(), stats.get_mean(), stats.get_std(),
+                                         stats.get_min(), stats.get_max(),
+                                         *self.__aggregator.value_counts(column, theme))
+        return describe_table(table)
+
+    def breakdown(self):
+        """Get descriptive statistics for selected columns over every game, each theme and each level"""
+        self.refresh()
+        rows = []
+        for column in ['Total Jump', 'Score', 'Level']:
+            groups = [("All", "", {})] + [("Theme", theme, {"theme": theme}) for theme in THEMES]
+            if column != 'Level':
+                groups += [("Level", level, {"level": level}) for level in self.__aggregator.levels()]
+            for group, value, scope in groups:
+                values, counts = self.__aggregator.value_counts(column, **scope)
+                if len(values):
+                    rows.append([group, value, column] + describe_counts(values, counts))
+        return pd.DataFrame(rows, columns=BREAKDOWN_COLUMNS)
 
-    def descriptive(self):
-        """Get descriptive statistics for selected columns"""
-        display_list = ['Total Jump', 'Score', 'Level']
-        return self.__df[display_list].describe()
+    def get_dataframe(self):
+        """Return every game as a dataframe, memory-mapped from the binary results file when there is one"""
+        store = ResultStore()
+        if store.exists():
+            return ResultStore.to_dataframe(store.load())
+        return pd.read_csv('game_results.csv')
+
+
+class SqlStat:
+    def __init__(self, database=None):
+        """Statistics computed by SQL aggregates, so only summaries are ever loaded from the database"""
+        self.__db = database if database is not None else ResultDatabase()
+
+    def close(self):
+        """Nothing to save, the database holds every aggregate"""
+
+    def get_version(self):
+        """Return the first and last row ids, which change when games are added or the table is replaced"""
+        return self.__db.query("SELECT MIN(id), MAX(id) FROM results")[0]
+
+    def pie_chart(self, figure_size=(5, 4)):
+        """Create a pie chart of theme distribution"""
+        return draw_pie_chart(self.__db.theme_counts(), figure_size)
+
+    def boxplot(self, figure_size=(5, 4)):
+        """Create a boxplot of scores by theme from per-theme score counts"""
+        by_theme = {}
+        for theme, score, games in self.__db.value_counts('Score', by_theme=True):
+            values, counts = by_theme.setdefault(theme, ([], []))
+            values.append(score)
+            counts.append(games)
+        return draw_boxplot([box_stats(theme, *pair) for theme, pair in by_theme.items()], figure_size)
+
+    def histogram(self, figure_size=(5, 4)):
+        """Create a histogram of total jumps from SQL bucket counts"""
+        return draw_histogram(*self.__db.histogram('Total Jump'), figure_size)
+
+    def scatter_plot(self, figure_size=(5, 4)):
+        """Create a scatter plot of jumps vs time played from SQL cell counts"""
+        cells = {}
+        for theme, jumps, played, games in self.__db.binned_pairs('Total Jump', 'Time Played'):
+            cells.setdefault(theme, []).append((jumps, played, games))
+        return draw_scatter_plot({theme: tuple(np.array(points).T) for theme, points in sorted(cells.items())},
+                                 figure_size)
+
+    def descriptive(self, theme=None):
+        """Get descriptive statistics for selected columns, like DataFrame.describe, over every game or one theme"""
+        table = {}
+        for column in ['Total Jump', 'Score', 'Level']:
+            count, low, high, mean, squares = self.__db.summary(column, theme)
+            values, counts = map(np.array, zip(*self.__db.value_counts(column, theme=theme))) if count else ((), ())
+            std = np.sqrt(max(squares - count * mean * mean, 0) / (count - 1)) if count > 1 else np.nan
+            table[column] = describe_row(count, mean, std, low, high, values, counts)
+        return describe_table(table)
+
+    def breakdown(self):
+        """Get descriptive statistics for selected columns over every game, each theme, each level and
+        each day, from per-group value counts"""
+        rows = []
+        for column in ['Total Jump', 'Score', 'Level']:
+            overall = self.__db.value_counts(column)
+            if overall:
+                rows.append(["All", "", column] + describe_counts(*zip(*overall)))
+            for group in ResultDatabase.GROUPS:
+                if group == 'Level' and column == 'Level':
+                    continue
+                for value, items in itertools.groupby(self.__db.grouped_value_counts(column, group),
+                                                      key=lambda item: item[0]):
+                    values, counts = zip(*[(value_, games) for _, value_, games in items])
+                    rows.append([group, value, column] + describe_counts(values, counts))
+        return pd.DataFrame(rows, columns=BREAKDOWN_COLUMNS)
 
     def get_dataframe(self):
-        """Return the dataframe for direct access"""
-        return self.__df
+        """Return every row as a dataframe; unlike the charts this loads the whole history"""
+        with closing(self.__db.connect()) as connection:
+            return pd.read_sql_query("SELECT jumps AS 'Total Jump', score AS Score, level AS Level, "
+                                     "time_played AS 'Time Played', final_speed AS 'Final Speed', theme AS Theme "
+                                     "FROM results ORDER BY id", connection)
+
+
+class VirtualTable:
+    def __init__(self, parent, worker, run_job, page_rows=Config.TABLE_PAGE_ROWS, height=15):
+        """A ttk.Treeview holding one page of a DataFrame at a time, so showing it costs O(page rows)
+        whatever the table size; clicking a heading sorts on the statistics worker"""
+        self.__worker = worker
+        self.__run_job = run_job
+        self.__page_rows = page_rows
+        self.__table = pd.DataFrame()
+        self.__page = 0
+        self.__sorted = (None, True)  # column, ascending
+
+        self.__frame = tk.Frame(parent, bg="white")
+        self.__frame.grid_rowconfigure(0, weight=1)
+        self.__frame.grid_columnconfigure(0, weight=1)
+
+        self.__tree = ttk.Treeview(self.__frame, show="headings", height=height)
+        scrollbar = ttk.Scrollbar(self.__frame, orient="vertical", command=self.__tree.yview)
+        self.__tree.configure(yscrollcommand=scrollbar.set)
+        self.__tree.grid(row=0, column=0, sticky="nsew")
+        scrollbar.grid(row=0, column=1, sticky="ns")
+
+        pager = tk.Frame(self.__frame, bg="white")
+        pager.grid(row=1, column=0, columnspan=2, sticky="ew", pady=5)
+        self.__previous = tk.Button(pager, text="< Previous", command=lambda: self.show_page(self.__page - 1))
+        self.__previous.pack(side=tk.LEFT)
+        self.__next = tk.Button(pager, text="Next >", command=lambda: self.show_page(self.__page + 1))
+        self.__next.pack(side=tk.RIGHT)
+        self.__status = tk.Label(pager, font=("Arial", 10), bg="white")
+        self.__status.pack()
+
+    def get_frame(self):
+        return self.__frame
+
+    def set_table(self, table):
+        """Show a DataFrame from its first page"""
+        self.__table = table
+        columns = [str(column) for column in table.columns]
+        if list(self.__tree["columns"]) != columns:
+            self.__tree.configure(columns=columns)
+            for column in columns:
+                self.__tree.heading(column, text=column, command=lambda name=column: self.sort(name))
+                self.__tree.column(column, width=max(60, 720 // len(columns)), anchor="center")
+        self.show_page(0)
+
+    def show_page(self, page):
+        """Replace the rows in the Treeview with one page of the table"""
+        pages = max(1, -(-len(self.__table) // self.__page_rows))
+        self.__page = min(max(page, 0), pages - 1)
+        start = self.__page * self.__page_rows
+        rows = self.__table.iloc[start:start + self.__page_rows]
+
+        self.__tree.delete(*self.__tree.get_children())
+        for row in rows.itertuples(index=False):
+            self.__tree.insert("", tk.END, values=[format_cell(value) for value in row])
+
+        self.__status.configure(text=f"Rows {start + 1}-{start + len(rows)} of {len(self.__table)}"
+                                if len(rows) else "No games yet")
+        self.__previous.configure(state=tk.NORMAL if self.__page > 0 else tk.DISABLED)
+        self.__next.configure(state=tk.NORMAL if self.__page < pages - 1 else tk.DISABLED)
+
+    def sort(self, column):
+        """Sort the whole table by a column on the worker thread, reversing on a second click"""
+        ascending = not self.__sorted[1] if self.__sorted[0] == column else True
+        self.__sorted = (column, ascending)
+        placeholder = tk.Label(self.__frame, text="Sorting...", font=("Arial", 10), bg="white")
+        placeholder.grid(row=2, column=0, columnspan=2)
+        self.__run_job(self.__frame, self.__worker.sort(self.__table, column, ascending), placeholder,
+                       self.set_table)
 
 
 class GameMenu:
@@ -102,7 +522,8 @@ class GameMenu:
         self.__main_frame.grid_rowconfigure(3, weight=1)
         self.__main_frame.grid_columnconfigure(0, weight=1)
 
-        self.__stat = Stat()
+        self.__worker = StatWorker(SqlStat() if Config.RESULTS_BACKEND == "sqlite" else Stat())
+        self.__jobs = {}  # widget path -> (StatJob filling that widget, its placeholder)
 
         self.__root.protocol("WM_DELETE_WINDOW", self.exit_game)
 
@@ -151,14 +572,14 @@ class GameMenu:
         self.__exit_button.grid(row=3, column=0, pady=20, sticky="nsew")
 
         self.__stat_windows = []
-        self.__active_figures = []
 
     def start_game(self):
         """linking to selecting theme page"""
         self.__root.withdraw()
 
         try:
-            pg.init()
+            pg.display.init()
+            pg.font.init()
             menu = SelectedMenu()
 
             running = True
@@ -199,9 +620,11 @@ class GameMenu:
             if window.winfo_exists():
                 window.destroy()
 
-        for fig in self.__active_figures:
-            plt.close(fig)
+        for frame in list(self.__jobs):
+            self.cancel_job(frame)
 
+        SaveFile.close_all()
+        self.__worker.close()
         try:
             pg.quit()
         except:
@@ -236,6 +659,12 @@ class GameMenu:
         desc_stats_frame.grid_rowconfigure(2, weight=0)  # Explanation
         desc_stats_frame.grid_columnconfigure(0, weight=1)
 
+        breakdown_frame = tk.Frame(notebook, bg="white")
+        notebook.add(breakdown_frame, text="Breakdowns")
+
+        breakdown_frame.grid_rowconfigure(1, weight=1)
+        breakdown_frame.grid_columnconfigure(0, weight=1)
+
         story_frame = tk.Frame(notebook, bg="white")
         notebook.add(story_frame, text="Visualizations")
 
@@ -244,6 +673,14 @@ class GameMenu:
 
         self.populate_descriptive_stats(desc_stats_frame)
 
+        # The breakdown is the slowest statistic and shares the worker thread with the charts, so it
+        # is only computed once its tab is first opened
+        def on_tab_changed(event):
+            if notebook.select() == str(breakdown_frame) and not breakdown_frame.winfo_children():
+                self.populate_breakdowns(breakdown_frame)
+
+        notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
+
         self.populate_storytelling(story_frame)
 
         close_button = tk.Button(
@@ -265,14 +702,8 @@ class GameMenu:
         if window in self.__stat_windows:
             self.__stat_windows.remove(window)
 
-        for fig in self.__active_figures:
-            plt.close(fig)
-        self.__active_figures = []
-
-        try:
-            window.unbind_all("<MouseWheel>")
-        except:
-            pass
+        for frame in [frame for frame in self.__jobs if frame.startswith(str(window) + ".")]:
+            self.cancel_job(frame)
 
         window.destroy()
 
@@ -287,84 +718,16 @@ class GameMenu:
         )
         title_label.grid(row=0, column=0, pady=20)
 
-        desc_stats = self.__stat.descriptive()
-
-        table_frame = tk.Frame(frame, bg="white")
-        table_frame.grid(row=1, column=0, sticky="nsew", padx=20)
+        placeholder = tk.Label(frame, text="Calculating statistics...", font=("Arial", 14), bg="white")
+        placeholder.grid(row=1, column=0)
+        self.run_job(frame, self.__worker.descriptive(), placeholder,
+                     lambda desc_stats: self.show_descriptive_table(frame, desc_stats))
 
-        table_canvas = tk.Canvas(table_frame, bg="white")
-        table_scrollbar = ttk.Scrollbar(table_frame, orient="horizontal", command=table_canvas.xview)
-        scrollable_table = tk.Frame(table_canvas, bg="white")
-
-        scrollable_table.bind(
-            "<Configure>",
-            lambda e: table_canvas.configure(
-                scrollregion=table_canvas.bbox("all")
-            )
-        )
-
-        table_canvas.create_window((0, 0), window=scrollable_table, anchor="nw")
-        table_canvas.configure(xscrollcommand=table_scrollbar.set)
-
-        table_canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-        table_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
-
-        df = desc_stats
-
-        header_style = {
-            "font": ("Arial", 11, "bold"),
-            "bg": "#4a7abc",
-            "fg": "white",
-            "padx": 10,
-            "pady": 5,
-            "borderwidth": 1,
-            "relief": "raised"
-        }
-
-        cell_style = {
-            "font": ("Arial", 10),
-            "bg": "white",
-            "fg": "black",
-            "padx": 10,
-            "pady": 5,
-            "borderwidth": 1,
-            "relief": "sunken"
-        }
-
-        alt_cell_style = {
-            "font": ("Arial", 10),
-            "bg": "#f0f0f0",
-            "fg": "black",
-            "padx": 10,
-            "pady": 5,
-            "borderwidth": 1,
-            "relief": "sunken"
-        }
-
-        row_header_style = {
-            "font": ("Arial", 10, "bold"),
-            "bg": "#e6e6e6",
-            "fg": "black",
-            "padx": 10,
-            "pady": 5,
-            "borderwidth": 1,
-            "relief": "raised",
-            "anchor": "w"
-        }
-
-        tk.Label(scrollable_table, text="", **header_style).grid(row=0, column=0, sticky="nsew")
-        for j, col in enumerate(df.columns):
-            tk.Label(scrollable_table, text=col, **header_style).grid(row=0, column=j + 1, sticky="nsew")
-
-        for i, idx in enumerate(df.index):
-            tk.Label(scrollable_table, text=idx, **row_header_style).grid(row=i + 1, column=0, sticky="nsew")
-
-            style = cell_style if i % 2 == 0 else alt_cell_style
-            for j, col in enumerate(df.columns):
-                value = df.loc[idx, col]
-                if isinstance(value, float):
-                    value = f"{value:.2f}"
-                tk.Label(scrollable_table, text=value, **style).grid(row=i + 1, column=j + 1, sticky="nsew")
+    def show_descriptive_table(self, frame, desc_stats):
+        """Fill the descriptive statistics tab with the table once the statistics are ready"""
+        table = VirtualTable(frame, self.__worker, self.run_job, height=8)
+        table.get_frame().grid(row=1, column=0, sticky="nsew", padx=20)
+        table.set_table(desc_stats.reset_index(names="Statistic"))
 
         explanation_frame = tk.Frame(frame, bg="white")
         explanation_frame.grid(row=2, column=0, sticky="ew", padx=20, pady=20)
@@ -391,6 +754,27 @@ minimum values (min), quartiles (25%, 50%, 75%), and maximum values (max).
         )
         explanation_label.grid(row=0, column=0, sticky="w")
 
+    def populate_breakdowns(self, frame):
+        """Fill the breakdowns tab with descriptive statistics per theme, level and, when known, day"""
+        title_label = tk.Label(
+            frame,
+            text="Statistics by Group",
+            font=("Arial", 18, "bold"),
+            bg="white",
+            fg="black"
+        )
+        title_label.grid(row=0, column=0, pady=20)
+
+        placeholder = tk.Label(frame, text="Calculating statistics...", font=("Arial", 14), bg="white")
+        placeholder.grid(row=1, column=0)
+
+        def show(breakdown):
+            table = VirtualTable(frame, self.__worker, self.run_job)
+            table.get_frame().grid(row=1, column=0, sticky="nsew", padx=20, pady=(0, 20))
+            table.set_table(breakdown)
+
+        self.run_job(frame, self.__worker.breakdown(), placeholder, show)
+
     def populate_storytelling(self, frame):
         """Show graphs in the storytelling tab with button selection"""
         main_frame = tk.Frame(frame, bg="white")
@@ -449,18 +833,60 @@ minimum values (min), quartiles (25%, 50%, 75%), and maximum values (max).
     def show_graph(graph_creator_func, frame):
         """Show a graph based on button selection"""
         for widget in frame.winfo_children():
-            widget.grid_forget()
+            widget.destroy()
 
         graph_creator_func(frame)
 
+    def show_chart_image(self, frame, chart, figure_size=(8, 6)):
+        """Show a chart rendered on the worker thread, with a placeholder until it is ready"""
+        placeholder = tk.Label(frame, text="Drawing chart...", font=("Arial", 14), bg="white")
+        placeholder.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+
+        def show(data):
+            image = tk.PhotoImage(master=self.__root, data=data)
+            label = tk.Label(frame, image=image, bg="white")
+            label.image = image  # a Label does not keep its image alive
+            label.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+
+        self.run_job(frame, self.__worker.chart(chart, figure_size), placeholder, show)
+
+    def run_job(self, frame, job, placeholder, on_done):
+        """Call on_done with the job's result in place of the placeholder once the worker has finished,
+        polling from the Tk main loop; a later job for the same frame cancels this one"""
+        self.cancel_job(frame)
+        self.__jobs[str(frame)] = (job, placeholder)
+        self.__root.after(Config.STAT_POLL_MS, self.poll_job, frame, job, placeholder, on_done)
+
+    def poll_job(self, frame, job, placeholder, on_done):
+        """Check a job from the Tk main loop, scheduling another check until it is done"""
+        if self.__jobs.get(str(frame), (None,))[0] is not job or not frame.winfo_exists():
+            return
+        if not job.done():
+            self.__root.after(Config.STAT_POLL_MS, self.poll_job, frame, job, placeholder, on_done)
+            return
+
+        del self.__jobs[str(frame)]
+        try:
+            result = job.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            print(f"Error computing statistics: {e}")
+            placeholder.configure(text="Could not compute the statistics")
+            return
+        placeholder.destroy()
+        on_done(result)
+
+    def cancel_job(self, frame):
+        """Cancel the job that would fill frame, if any, and remove its placeholder"""
+        job, placeholder = self.__jobs.pop(str(frame), (None, None))
+        if job is not None:
+            job.cancel()
+            placeholder.destroy()
+
     def create_pie_chart(self, frame):
         """Create and display pie chart in frame"""
-        pie_fig = self.__stat.pie_chart(figure_size=(8, 6))
-        self.__active_figures.append(pie_fig)
-
-        pie_canvas = FigureCanvasTkAgg(pie_fig, master=frame)
-        pie_canvas.draw()
-        pie_canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        self.show_chart_image(frame, "pie_chart")
 
         title = tk.Label(
             frame,
@@ -481,12 +907,7 @@ minimum values (min), quartiles (25%, 50%, 75%), and maximum values (max).
 
     def create_boxplot(self, frame):
         """Create and display boxplot in frame"""
-        box_fig = self.__stat.boxplot(figure_size=(8, 6))
-        self.__active_figures.append(box_fig)
-
-        box_canvas = FigureCanvasTkAgg(box_fig, master=frame)
-        box_canvas.draw()
-        box_canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        self.show_chart_image(frame, "boxplot")
 
         title = tk.Label(
             frame,
@@ -508,12 +929,7 @@ minimum values (min), quartiles (25%, 50%, 75%), and maximum values (max).
 
     def create_histogram(self, frame):
         """Create and display histogram in frame"""
-        hist_fig = self.__stat.histogram(figure_size=(8, 6))
-        self.__active_figures.append(hist_fig)
-
-        hist_canvas = FigureCanvasTkAgg(hist_fig, master=frame)
-        hist_canvas.draw()
-        hist_canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        self.show_chart_image(frame, "histogram")
 
         # Add title
         title = tk.Label(
@@ -536,12 +952,7 @@ minimum values (min), quartiles (25%, 50%, 75%), and maximum values (max).
 
     def create_scatter_plot(self, frame):
         """Create and display scatter plot in frame"""
-        scatter_fig = self.__stat.scatter_plot(figure_size=(8, 6))
-        self.__active_figures.append(scatter_fig)
-
-        scatter_canvas = FigureCanvasTkAgg(scatter_fig, master=frame)
-        scatter_canvas.draw()
-        scatter_canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        self.show_chart_image(frame, "scatter_plot")
 
         title = tk.Label(
             frame,
@@ -0,0 +1,106 @@
+import csv
+import os
+import time
+from collections import deque
+from config import Config
+
+
+class FrameProfiler:
+    PHASES = ("events", "update", "draw", "present", "tick")
+
+    def __init__(self, enabled=Config.PROFILE, window=Config.PROFILE_WINDOW, trace_frames=Config.PROFILE_TRACE_FRAMES):
+        """Time each phase of a frame and keep rolling frame-time percentiles"""
+        self.__enabled = enabled
+        self.__show_overlay = enabled
+        self.__frame_times = deque(maxlen=window)
+        self.__trace = deque(maxlen=trace_frames)
+        self.__in_frame = False
+        self.__frame_start = 0.0
+        self.__mark = 0.0
+        self.__phase_times = [0.0] * len(self.PHASES)
+        self.__phase = 0
+        self.__frames = 0
+        self.__dropped = 0
+        self.__budget_ms = 1000 / (Config.RENDER_FPS or Config.TICK_RATE)
+        self.__summary = None
+        self.__summary_time = 0.0
+
+    def is_enabled(self):
+        return self.__enabled
+
+    def toggle_overlay(self):
+        """Show or hide the timing overlay, enabling the profiler the first time it is shown"""
+        self.__show_overlay = not self.__show_overlay
+        self.__enabled = self.__enabled or self.__show_overlay
+
+    def is_overlay_shown(self):
+        return self.__show_overlay
+
+    def begin_frame(self):
+        if not self.__enabled:
+            return
+        self.__in_frame = True
+        self.__frame_start = self.__mark = time.perf_counter()
+        self.__phase = 0
+
+    def mark(self):
+        """Close the current phase, in the order of PHASES"""
+        if not self.__in_frame:
+            return
+        now = time.perf_counter()
+        self.__phase_times[self.__phase] = (now - self.__mark) * 1000
+        self.__phase += 1
+        self.__mark = now
+
+    def end_frame(self, idle=False):
+        """Close the frame; idle frames are traced but left out of percentiles and dropped frames"""
+        if not self.__in_frame:
+            return
+        self.__in_frame = False
+        frame_ms = (time.perf_counter() - self.__frame_start) * 1000
+        self.__frames += 1
+        if not idle:
+            self.__frame_times.append(frame_ms)
+            if frame_ms > self.__budget_ms * 1.5:
+                self.__dropped += 1
+        self.__trace.append((self.__frames, int(idle), round(frame_ms, 3),
+                             *[round(t, 3) for t in self.__phase_times]))
+
+    def percentiles(self):
+        """Return p50/p95/p99 of the rolling frame times in milliseconds and the dropped frame count"""
+        times = sorted(self.__frame_times)
+        if not times:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "dropped": self.__dropped}
+        last = len(times) - 1
+        return {"p50": times[round(last * 0.50)],
+                "p95": times[round(last * 0.95)],
+                "p99": times[round(last * 0.99)],
+                "dropped": self.__dropped}
+
+    def overlay_lines(self):
+        """Return the overlay text, recomputed at most twice a second"""
+        now = time.perf_counter()
+        if self.__summary is None or now - self.__summary_time > 0.5:
+            stats = self.percentiles()
+            self.__summary = [f"p50 {stats['p50']:.1f}  p95 {stats['p95']:.1f}  p99 {stats['p99']:.1f} ms",
+                              f"dropped {stats['dropped']} / {self.__frames}",
+                              "  ".join(f"{phase} {t:.1f}" for phase, t in zip(self.PHASES, self.__phase_times))]
+            self.__summary_time = now
+        return self.__summary
+
+    def dump(self, path=None):
+        """Write the per-frame phase timings of the latest Config.PROFILE_TRACE_FRAMES frames as CSV,
+        return the path"""
+        if not self.__trace:
+            return None
+        if path is None:
+            os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+            path = os.path.join(Config.PROFILE_DIR, time.strftime("%Y%m%d-%H%M%S") + ".csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "idle", "frame_ms"] + [f"{phase}_ms" for phase in self.PHASES])
+            writer.writerows(self.__trace)
+        stats = self.percentiles()
+        print(f"Frame trace saved to {path}: p50 {stats['p50']:.2f} ms, p95 {stats['p95']:.2f} ms, "
+              f"p99 {stats['p99']:.2f} ms, {stats['dropped']} dropped of {self.__frames}")
+        return path
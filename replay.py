@@ -0,0 +1,139 @@
+import os
+import sys
+import time
+import pygame as pg
+from config import Config
+from game_component import Drawer
+from simulation import Simulation
+
+MAGIC = b"RTRR"
+VERSION = 1
+HEADER_SIZE = 18  # magic, version, theme id, seed and jump count before the tick deltas
+
+
+class Replay:
+    def __init__(self, theme, seed, jump_ticks=None):
+        """The inputs of one playthrough: theme, RNG seed and the tick of every jump press"""
+        self.theme = theme
+        self.seed = seed
+        self.jump_ticks = jump_ticks if jump_ticks is not None else []
+
+    def record_jump(self, tick):
+        """Record a jump press after tick simulation steps"""
+        self.jump_ticks.append(tick)
+
+    def to_bytes(self):
+        """Encode as magic, version, theme id, seed and varint-encoded tick deltas"""
+        data = bytearray(MAGIC)
+        data.append(VERSION)
+        data.append(Config.THEME_ID[self.theme])
+        data += self.seed.to_bytes(8, "little")
+        data += len(self.jump_ticks).to_bytes(4, "little")
+        previous = 0
+        for tick in self.jump_ticks:
+            delta = tick - previous
+            previous = tick
+            while delta >= 0x80:
+                data.append(delta & 0x7F | 0x80)
+                delta >>= 7
+            data.append(delta)
+        return bytes(data)
+
+    @staticmethod
+    def from_bytes(data):
+        """Decode to_bytes output, raising ValueError for anything else, including a truncated replay"""
+        if len(data) < HEADER_SIZE or data[:4] != MAGIC or data[4] != VERSION:
+            raise ValueError("Not a Running to Reality replay")
+        theme = next((name for name, theme_id in Config.THEME_ID.items() if theme_id == data[5]), None)
+        if theme is None:
+            raise ValueError(f"Unknown replay theme {data[5]}")
+        seed = int.from_bytes(data[6:14], "little")
+        count = int.from_bytes(data[14:18], "little")
+
+        jump_ticks = []
+        position = HEADER_SIZE
+        tick = 0
+        for _ in range(count):
+            delta = shift = 0
+            while True:
+                if position >= len(data):
+                    raise ValueError("Truncated replay")
+                byte = data[position]
+                position += 1
+                delta |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80:
+                    break
+            tick += delta
+            jump_ticks.append(tick)
+        return Replay(theme, seed, jump_ticks)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return Replay.from_bytes(f.read())
+
+    def play(self):
+        """Re-execute the inputs through the game rules as fast as possible, return the result row"""
+        return Simulation(self.theme, self.seed).run(self.jump_ticks)
+
+    def render(self):
+        """Re-execute the inputs in a window at real speed, return the result row"""
+        drawer = Drawer()
+        drawer.updating()
+        drawer.set_theme(Config.THEME_ID[self.theme])
+        simulation = Simulation(self.theme, self.seed)
+        next_jump = 0
+
+        while not simulation.is_over():
+            for ev in pg.event.get():
+                if ev.type == pg.QUIT or (ev.type == pg.KEYDOWN and ev.key == pg.K_ESCAPE):
+                    return simulation.result()
+            while next_jump < len(self.jump_ticks) and self.jump_ticks[next_jump] == simulation.get_ticks():
+                simulation.jump()
+                next_jump += 1
+            simulation.step()
+            drawer.draw_game(simulation.get_runner(), simulation.get_obstacles(),
+                             simulation.get_score(), simulation.get_level())
+            drawer.update()
+            drawer.tick(Config.TICK_RATE)
+        return simulation.result()
+
+
+def new_replay_path(keep=Config.REPLAY_KEEP):
+    """Return a fresh file name in Config.REPLAY_DIR, deleting the oldest replays so that keep remain
+    once it is saved"""
+    os.makedirs(Config.REPLAY_DIR, exist_ok=True)
+    replays = sorted(name for name in os.listdir(Config.REPLAY_DIR) if name.endswith(".rtr"))
+    for name in replays[:max(0, len(replays) - keep + 1)]:
+        try:
+            os.remove(os.path.join(Config.REPLAY_DIR, name))
+        except OSError as e:
+            print(f"Could not delete old replay {name}: {e}")
+    return os.path.join(Config.REPLAY_DIR, time.strftime("%Y%m%d-%H%M%S") + f"-{time.time_ns() % 10 ** 9:09d}.rtr")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("usage: python replay.py REPLAY_FILE... [--render]")
+        sys.exit(1)
+
+    render = "--render" in sys.argv
+    for path in sys.argv[1:]:
+        if path == "--render":
+            continue
+        try:
+            replay = Replay.load(path)
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}")
+            continue
+        start = time.perf_counter()
+        row = replay.render() if render else replay.play()
+        elapsed = time.perf_counter() - start
+        print(f"{path}: {row} in {elapsed * 1000:.2f} ms")
+    if render:
+        pg.quit()
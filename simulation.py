@@ -0,0 +1,208 @@
+import random
+import time
+from config import Config
+from game_component import Runner
+from spawner import ObstacleSpawner
+from trajectory import JumpArc
+
+
+class DifficultyCurve:
+    def __init__(self, points_per_level=10, speed_step=0.5, gravity_step=0.04, level_cap=7,
+                 start_speed=5, start_gravity=0.4):
+        """How the game speeds up: every points_per_level points the level rises, and up to level_cap
+        each level adds speed_step to the speed and gravity_step to the gravity"""
+        self.points_per_level = points_per_level
+        self.speed_step = speed_step
+        self.gravity_step = gravity_step
+        self.level_cap = level_cap
+        self.start_speed = start_speed
+        self.start_gravity = start_gravity
+
+    def __repr__(self):
+        return (f"DifficultyCurve(points_per_level={self.points_per_level}, speed_step={self.speed_step}, "
+                f"gravity_step={self.gravity_step}, level_cap={self.level_cap})")
+
+
+class Simulation:
+    def __init__(self, theme="Escaping F", seed=0, stress=False, pixel_collision=Config.PIXEL_COLLISION,
+                 curve=None):
+        """Game rules for one playthrough, stepped without a window or a wall clock"""
+        self.__curve = curve if curve is not None else DifficultyCurve()
+        self.__theme = theme
+        self.__seed = seed
+        self.__random = random.Random(seed)
+        self.__runner = Runner(Config.POSITION_RUNNER[theme][0], Config.POSITION_RUNNER[theme][1])
+        self.__runner.set_theme(Config.THEME_ID[theme])
+        self.__spawner = ObstacleSpawner(theme, self.__random, stress)
+        self.__score = 0
+        self.__jump = 0
+        self.__level = 1
+        self.__speed = self.__curve.start_speed
+        self.__gravity = self.__curve.start_gravity
+        self.__ticks = 0
+        self.__is_over = False
+        self.__pixel_collision = pixel_collision
+        self.__broad_tests = 0
+        self.__broad_hits = 0
+        self.__narrow_hits = 0
+
+    def get_seed(self):
+        return self.__seed
+
+    def get_runner(self):
+        return self.__runner
+
+    def get_obstacles(self):
+        """Return the active obstacles, sorted by x from left to right"""
+        return self.__spawner.get_active()
+
+    def get_score(self):
+        return self.__score
+
+    def get_level(self):
+        return self.__level
+
+    def get_speed(self):
+        return self.__speed
+
+    def get_curve(self):
+        return self.__curve
+
+    def get_ticks(self):
+        return self.__ticks
+
+    def is_over(self):
+        return self.__is_over
+
+    def elapsed_time(self):
+        """Return the simulated seconds played so far"""
+        return self.__ticks / Config.TICK_RATE
+
+    def find_dis(self, obstacle):
+        """Check if the runner collides with the obstacle: bounding boxes first, then the sprite masks."""
+        runner_rect = self.__runner.get_rect()
+        obs_rect = obstacle.get_rect()
+        self.__broad_tests += 1
+        if not runner_rect.colliderect(obs_rect):
+            return False
+        self.__broad_hits += 1
+        if not self.__pixel_collision:
+            return True
+
+        offset = (obs_rect.x - runner_rect.x, obs_rect.y - runner_rect.y)
+        if self.__runner.get_mask().overlap(obstacle.get_mask(), offset) is None:
+            return False
+        self.__narrow_hits += 1
+        return True
+
+    def collision_stats(self):
+        """Return how many rect tests ran, how many reached the mask test and how many of those collided"""
+        return {"tests": self.__broad_tests,
+                "broad_hits": self.__broad_hits,
+                "narrow_hits": self.__narrow_hits,
+                "broad_hit_rate": self.__broad_hits / self.__broad_tests if self.__broad_tests else 0.0}
+
+    def check_is_on_top(self, obstacle):
+        """Check if the runner lands on top of the obstacle."""
+        runner_rect = self.__runner.get_rect()
+        obs_rect = obstacle.get_rect()
+
+        is_above = obs_rect.top + 20 < runner_rect.bottom
+        is_within_x_range = (runner_rect.right > obs_rect.left) and (runner_rect.left < obs_rect.right)
+
+        return is_above and is_within_x_range
+
+    def get_arc(self):
+        """Return the jump arc a jump pressed now would follow"""
+        return JumpArc.get(Config.POSITION_RUNNER[self.__theme][1], self.__gravity)
+
+    def will_clear(self, obstacle):
+        """Check if a jump pressed now, from the ground, gets past the obstacle at the current speed.
+        The check uses the bounding boxes, so with pixel collision a True is certain and a False may not be."""
+        return self.get_arc().will_clear(self.__runner.get_rect(), obstacle.get_rect(),
+                                         self.__speed + self.__level, obstacle.get_x())
+
+    def jump(self):
+        """Press the jump key."""
+        self.__jump += 1
+        self.__runner.jump()
+
+    def step(self):
+        """Advance the game rules by one fixed simulation tick, return True when the game ends."""
+        if self.__is_over:
+            return True
+
+        self.__ticks += 1
+        self.__runner.update(self.__gravity)
+        step = self.__speed + self.__level
+        self.__spawner.update(self.__level, self.__speed, self.get_arc().get_airtime() * step)
+
+        # Obstacles are sorted by x, so only the few starting left of the runner's right edge
+        # can collide with it or have been passed
+        runner_rect = self.__runner.get_rect()
+        obstacles = self.__spawner.get_active()
+        near = self.__spawner.count_near(runner_rect.right)
+
+        for i in range(near):
+            if self.find_dis(obstacles[i]):
+                self.__is_over = True
+                return True
+
+        # An obstacle scores once, the first time the runner is over it or past it; with pixel
+        # collision the boxes can overlap without a game over, so the flag is only cleared when
+        # the spawner places the obstacle again
+        for i in range(near):
+            obstacle = obstacles[i]
+            if obstacle.has_passed():
+                continue
+            if self.check_is_on_top(obstacle) or obstacle.get_rect().right < runner_rect.left:
+                obstacle.set_passed(True)
+                self.__score += 1
+                if self.__score % self.__curve.points_per_level == 0:
+                    self.__level += 1
+                    if self.__level <= self.__curve.level_cap:
+                        self.__speed += self.__curve.speed_step
+                        self.__gravity += self.__curve.gravity_step
+
+        return False
+
+    def result(self):
+        """Return the row SaveFile.add_data writes for this playthrough"""
+        return [self.__jump, self.__score, self.__level, round(self.elapsed_time(), 2), self.__speed, self.__theme]
+
+    def run(self, jump_ticks=(), max_ticks=None):
+        """Play scripted inputs as fast as possible and return the result row.
+
+        jump_ticks holds the tick counts at which the jump key is pressed, i.e. a press at t
+        happens after t steps and before step t + 1.
+        """
+        jump_ticks = sorted(jump_ticks)
+        next_jump = 0
+        while not self.__is_over and (max_ticks is None or self.__ticks < max_ticks):
+            while next_jump < len(jump_ticks) and jump_ticks[next_jump] <= self.__ticks:
+                if jump_ticks[next_jump] == self.__ticks:
+                    self.jump()
+                next_jump += 1
+            self.step()
+        return self.result()
+
+
+if __name__ == '__main__':
+    games = 0
+    total_ticks = 0
+    tests = broad_hits = narrow_hits = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < 5:
+        for theme in Config.THEME_ID:
+            simulation = Simulation(theme)
+            simulation.run(range(games % 50, 100000, 45 + games % 7), max_ticks=100000)
+            total_ticks += simulation.get_ticks()
+            games += 1
+            stats = simulation.collision_stats()
+            tests += stats["tests"]
+            broad_hits += stats["broad_hits"]
+            narrow_hits += stats["narrow_hits"]
+    elapsed = time.perf_counter() - start
+    print(f"{games} games, {total_ticks} ticks in {elapsed:.2f} s ({total_ticks / elapsed:,.0f} ticks/s)")
+    print(f"{tests} rect tests, {broad_hits} reached the mask test ({broad_hits / tests:.2%} of tests, "
+          f"{broad_hits / total_ticks:.2%} of ticks), {narrow_hits} collided")
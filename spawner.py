@@ -0,0 +1,70 @@
+from collections import deque
+from config import Config
+from game_component import Obstacle
+
+
+class ObstacleSpawner:
+    def __init__(self, theme, rng, stress=False):
+        """Keep the active obstacles sorted by x, drawing new ones from a preallocated pool"""
+        x, y = Config.POSITION_OBSTACLE[theme]
+        self.__rng = rng
+        self.__stress = stress
+        self.__pool = [Obstacle(x, y) for _ in range(Config.STRESS_OBSTACLES if stress else Config.MAX_OBSTACLES)]
+        for obstacle in self.__pool:
+            obstacle.set_theme(Config.THEME_ID[theme])
+        self.__active = deque()
+        self.__active.append(self.__pool.pop())
+
+    def get_active(self):
+        """Return the active obstacles, sorted by x from left to right"""
+        return self.__active
+
+    def limit(self, level):
+        """Return how many obstacles may be active at a level"""
+        if self.__stress:
+            return Config.STRESS_OBSTACLES
+        if level <= Config.OBSTACLE_LEVEL_CAP:
+            return 1
+        return min(1 + level - Config.OBSTACLE_LEVEL_CAP, Config.MAX_OBSTACLES)
+
+    def __spawn_x(self, clearance):
+        """Return where the next obstacle enters: the right edge, or a random gap after the last one"""
+        if not self.__active:
+            return Config.GAME_WIDTH
+        if self.__stress:
+            gap = self.__rng.randint(*Config.STRESS_GAP)
+        else:
+            gap = clearance + self.__rng.randint(*Config.OBSTACLE_GAP)
+        return max(Config.GAME_WIDTH, self.__active[-1].get_rect().right + gap)
+
+    def update(self, level, speed, clearance=0):
+        """Move every active obstacle, recycle the ones that left the screen and spawn up to the limit.
+        clearance is the distance an obstacle travels during one jump, the least room between two
+        obstacles that lets the runner land and jump again."""
+        for obstacle in self.__active:
+            obstacle.update(level, speed)
+
+        # Every obstacle moves at the same speed, so the ones that wrapped are at the front
+        limit = self.limit(level)
+        while self.__active and self.__active[0].is_reset():
+            obstacle = self.__active.popleft()
+            if len(self.__active) < limit:
+                obstacle.place(self.__spawn_x(clearance))
+                self.__active.append(obstacle)
+            else:
+                self.__pool.append(obstacle)
+
+        while len(self.__active) < limit and self.__pool:
+            obstacle = self.__pool.pop()
+            obstacle.place(self.__spawn_x(clearance))
+            self.__active.append(obstacle)
+
+    def count_near(self, right):
+        """Return how many obstacles from the front start left of x = right, the only ones that can
+        touch or have passed something whose right edge is there"""
+        count = 0
+        for obstacle in self.__active:
+            if obstacle.get_rect().left >= right:
+                break
+            count += 1
+        return count
@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+
+from aggregator import ResultAggregator
+from data import ResultStore
+
+THEMES = ["Escaping F", "Escaping T", "Rescuing G"]
+
+
+def rows(count, jumps=1):
+    return [[jumps + i % 5, i % 7, 1 + i % 3, 2.5 + i, 5, THEMES[i % 3]] for i in range(count)]
+
+
+def aggregator(tmp_path, store):
+    return ResultAggregator(store, csv_path=str(tmp_path / "none.csv"), sidecar=str(tmp_path / "stats.npz"))
+
+
+def test_sidecar_resumes_after_the_rows_already_read(tmp_path):
+    store = ResultStore(str(tmp_path / "results.bin"))
+    store.add_rows(rows(50))
+    first = aggregator(tmp_path, store)
+    assert first.update() == 50
+    first.save()
+
+    store.add_rows(rows(20, jumps=10))
+    resumed = aggregator(tmp_path, store)
+    assert resumed.update() == 20  # only the rows appended since the save
+    assert resumed.get_count() == 70
+
+    fresh = ResultAggregator(store, csv_path=str(tmp_path / "none.csv"), sidecar=None)
+    assert fresh.update() == 70
+    state, expected = resumed.get_state(), fresh.get_state()
+    assert state.keys() == expected.keys()
+    assert dict(zip(state.pop("cell_keys"), state.pop("cell_counts"))) == \
+        dict(zip(expected.pop("cell_keys"), expected.pop("cell_counts")))
+    for name, value in expected.items():
+        np.testing.assert_allclose(state[name], value, err_msg=name)
+
+
+def test_replaced_results_file_is_read_from_the_start(tmp_path):
+    store = ResultStore(str(tmp_path / "results.bin"))
+    store.add_rows(rows(50))
+    first = aggregator(tmp_path, store)
+    first.update()
+    first.save()
+
+    # The same size with other rows, written over in place as well as through a new file
+    replacement = ResultStore(str(tmp_path / "replacement.bin"))
+    replacement.add_rows(rows(50, jumps=100))
+    with open(replacement.get_path(), "rb") as source, open(store.get_path(), "r+b") as f:
+        f.write(source.read())
+    in_place = aggregator(tmp_path, store)
+    assert in_place.update() == 50
+    assert in_place.get_stats("Total Jump").get_min() == 100
+
+    os.replace(replacement.get_path(), store.get_path())
+    assert first.update() == 50  # a new inode
+    assert first.get_count() == 50
+    assert first.get_stats("Total Jump").get_min() == 100
+
+
+def test_truncated_results_file_is_read_from_the_start(tmp_path):
+    store = ResultStore(str(tmp_path / "results.bin"))
+    store.add_rows(rows(50))
+    running = aggregator(tmp_path, store)
+    running.update()
+
+    os.remove(store.get_path())
+    store.add_rows(rows(10, jumps=100))
+    assert running.update() == 10
+    assert running.get_count() == 10
+    assert running.get_stats("Total Jump").get_min() == 100
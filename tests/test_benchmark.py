@@ -0,0 +1,48 @@
+import pytest
+
+from benchmark import combine, compare
+
+
+def test_compare_holds_non_positive_baselines_at_zero():
+    baseline = {"alloc_blocks_per_tick": {"value": -0.002}}
+    assert compare({"alloc_blocks_per_tick": (0.0, "blocks", "lower")}, baseline, 0.2) == []
+    assert compare({"alloc_blocks_per_tick": (5.0, "blocks", "lower")}, baseline, 0.2) == ["alloc_blocks_per_tick"]
+
+
+def quiet(**results):
+    """Return a baseline of four results whose runs agreed, so the spread floor is zero, plus results"""
+    baseline = {f"quiet_{i}": {"value": 1.0, "noise": 0.0} for i in range(4)}
+    baseline.update(results)
+    return baseline
+
+
+def test_compare_allows_twice_the_baseline_spread():
+    baseline = quiet(find_dis={"value": 100.0, "noise": 0.0}, draw_fps={"value": 1000.0, "noise": 0.25})
+    assert compare({"find_dis": (119.0, "ns/call", "lower")}, baseline, 0.2) == []
+    assert compare({"find_dis": (121.0, "ns/call", "lower")}, baseline, 0.2) == ["find_dis"]
+    assert compare({"draw_fps": (1000 / 1.69, "fps", "higher")}, baseline, 0.2) == []
+    assert compare({"draw_fps": (1000 / 1.71, "fps", "higher")}, baseline, 0.2) == ["draw_fps"]
+
+
+def test_compare_allows_at_least_the_upper_quartile_spread():
+    baseline = {"find_dis": {"value": 100.0, "noise": 0.0}, "will_clear": {"value": 100.0, "noise": 0.05},
+                "draw_fps": {"value": 1000.0, "noise": 0.1}, "stress_fps": {"value": 1000.0, "noise": 0.3}}
+    assert compare({"find_dis": (179.0, "ns/call", "lower")}, baseline, 0.2) == []
+    assert compare({"find_dis": (181.0, "ns/call", "lower")}, baseline, 0.2) == ["find_dis"]
+
+
+def test_compare_fails_a_halved_throughput_whatever_the_spread():
+    baseline = {"runner_update": {"value": 3.5e6, "noise": 0.37}, "draw_fps": {"value": 1000.0, "noise": 5.0},
+                "find_dis": {"value": 100.0, "noise": 5.0}}
+    assert compare({"runner_update": (1.0, "ops/s", "higher")}, baseline, 0.2) == ["runner_update"]
+    assert compare({"draw_fps": (490.0, "fps", "higher")}, baseline, 0.2) == ["draw_fps"]
+    assert compare({"draw_fps": (0.0, "fps", "higher")}, baseline, 0.2) == ["draw_fps"]
+    assert compare({"find_dis": (201.0, "ns/call", "lower")}, baseline, 0.2) == ["find_dis"]
+
+
+def test_combine_keeps_the_best_run_and_its_spread():
+    runs = [{"find_dis": (120.0, "ns/call", "lower"), "draw_fps": (800.0, "fps", "higher")},
+            {"find_dis": (100.0, "ns/call", "lower"), "draw_fps": (1000.0, "fps", "higher")}]
+    results, noise = combine(runs)
+    assert results == {"find_dis": (100.0, "ns/call", "lower"), "draw_fps": (1000.0, "fps", "higher")}
+    assert noise == pytest.approx({"find_dis": 0.2, "draw_fps": 0.25})
@@ -0,0 +1,99 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from autopilot import Autopilot
+from config import Config
+from data import ResultStore, ResultDatabase, SaveFile, HEADER_SIZE, RESULT_DTYPE
+from simulation import Simulation
+
+ROWS = [[4, 2, 1, 7.4, 5, "Rescuing G"], [12, 9, 3, 40.25, 6.0, "Escaping F"], [0, 0, 1, 1.49, 5, "Escaping T"]]
+
+
+def game_rows(games):
+    """Return the result rows of seeded autopilot games, as the game hands them to SaveFile"""
+    rows = []
+    for seed in range(games):
+        theme = list(Config.THEME_ID)[seed % len(Config.THEME_ID)]
+        simulation = Simulation(theme, seed)
+        rows.append(Autopilot(random.Random(seed), reaction=(0, 30)).play(simulation, max_ticks=4000))
+    return rows
+
+
+def test_append_load_and_tail(tmp_path):
+    store = ResultStore(str(tmp_path / "results.bin"))
+    store.add_rows(ROWS[:2])
+    records = store.load()
+    assert records["jumps"].tolist() == [4, 12]
+    assert records["theme"].tolist() == [3, 1]
+    assert records["speed"].tolist() == [5.0, 6.0]
+
+    tail, offset = store.tail()
+    assert len(tail) == 2 and offset == os.path.getsize(store.get_path())
+    store.add_rows(ROWS[2:])
+    tail, offset = store.tail(offset)
+    assert tail["theme"].tolist() == [2]
+    assert offset == HEADER_SIZE + 3 * RESULT_DTYPE.itemsize
+
+
+def test_partial_record_is_ignored_then_trimmed(tmp_path):
+    store = ResultStore(str(tmp_path / "results.bin"))
+    store.add_rows(ROWS[:1])
+    with open(store.get_path(), "ab") as f:
+        f.write(b"\x01\x02\x03")  # a write interrupted part way through a record
+    assert len(store.load()) == 1
+    tail, offset = store.tail()
+    assert len(tail) == 1 and offset == HEADER_SIZE + RESULT_DTYPE.itemsize
+
+    store.add_rows(ROWS[1:])
+    assert os.path.getsize(store.get_path()) == HEADER_SIZE + 3 * RESULT_DTYPE.itemsize
+    assert store.load()["jumps"].tolist() == [4, 12, 0]
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "results.bin"
+    path.write_bytes(b"Total Jump,Score\n")
+    with pytest.raises(ValueError):
+        ResultStore(str(path)).load()
+
+
+@pytest.mark.parametrize("backend", [ResultStore, ResultDatabase])
+def test_csv_round_trip_is_byte_for_byte(tmp_path, monkeypatch, backend):
+    results = game_rows(30)
+    monkeypatch.chdir(tmp_path)
+    save_file = SaveFile(store=ResultStore(str(tmp_path / "saved.bin")))  # also writes the game's CSV copy
+    for row in results:
+        save_file.add_data(row)
+    save_file.close()
+    written = (tmp_path / "game_results.csv").read_bytes()
+    assert b".0," in written and b",5," in written  # float speeds past level 1, the int start speed before
+
+    store = backend(str(tmp_path / "imported"))
+    assert store.import_csv("game_results.csv") == 30
+    assert store.export_csv("exported.csv") == 30
+    assert (tmp_path / "exported.csv").read_bytes() == written
+
+
+@pytest.mark.parametrize("backend", [ResultStore, ResultDatabase])
+def test_repo_history_round_trip_keeps_every_value(tmp_path, backend):
+    # Older versions of the game wrote whole speeds past level 1 as 6 where it now writes 6.0, so only
+    # the values of this mixed history survive, not its text
+    import pandas as pd
+
+    store = backend(str(tmp_path / "imported"))
+    assert store.import_csv("game_results.csv") == len(pd.read_csv("game_results.csv"))
+    store.export_csv(str(tmp_path / "exported.csv"))
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "exported.csv"), pd.read_csv("game_results.csv"),
+                                  check_dtype=False)
+
+
+def test_save_fsync_syncs_the_binary_store(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(Config, "SAVE_FSYNC", True)
+    monkeypatch.setattr(os, "fsync", synced.append)
+    store = ResultStore(str(tmp_path / "results.bin"))
+    store.add_rows(ROWS)
+    assert len(synced) == 1
+    np.testing.assert_array_equal(store.load()["level"], [1, 3, 1])
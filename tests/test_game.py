@@ -0,0 +1,28 @@
+import os
+import time
+import pygame as pg
+from conftest import ROOT
+from game import Game, SoundEffects
+
+
+def scripted_events(keys):
+    """Return a pg.event.get replacement that waits for the sound effects, presses keys one per frame, then quits"""
+    script = [[pg.event.Event(pg.KEYDOWN, key=key)] for key in keys] + [[pg.event.Event(pg.QUIT)]]
+
+    def get():
+        deadline = time.monotonic() + 10
+        while not SoundEffects.get_instance().is_ready() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return script.pop(0)
+    return get
+
+
+def test_sound_plays_after_pg_quit_between_games(tmp_path, monkeypatch):
+    os.symlink(os.path.join(ROOT, "photo"), tmp_path / "photo")
+    monkeypatch.chdir(tmp_path)  # keep the results and the sound cache of these games out of the repo
+    for _ in range(2):
+        monkeypatch.setattr(pg.event, "get", scripted_events([pg.K_SPACE, pg.K_SPACE]))
+        Game().run()  # starts, jumps and quits; pg.quit() closes the mixer as GameMenu.start_game does
+        pg.quit()
+        assert not pg.mixer.get_init()
+    assert SoundEffects.get_instance().is_ready()
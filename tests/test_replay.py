@@ -0,0 +1,29 @@
+import pytest
+
+from replay import Replay, HEADER_SIZE
+
+
+def test_round_trip():
+    replay = Replay("Rescuing G", 2 ** 64 - 1, [0, 1, 127, 128, 300, 20000, 2 ** 21 + 5])
+    decoded = Replay.from_bytes(replay.to_bytes())
+    assert (decoded.theme, decoded.seed, decoded.jump_ticks) == (replay.theme, replay.seed, replay.jump_ticks)
+
+
+def test_round_trip_without_jumps():
+    data = Replay("Escaping F", 7).to_bytes()
+    assert len(data) == HEADER_SIZE
+    assert Replay.from_bytes(data).jump_ticks == []
+
+
+def test_unknown_theme_is_a_value_error():
+    data = bytearray(Replay("Escaping T", 7, [10]).to_bytes())
+    data[5] = 99
+    with pytest.raises(ValueError, match="theme"):
+        Replay.from_bytes(bytes(data))
+
+
+@pytest.mark.parametrize("length", [0, 3, 5, HEADER_SIZE - 1, HEADER_SIZE, HEADER_SIZE + 2])
+def test_truncated_replay_is_a_value_error(length):
+    data = Replay("Escaping T", 7, [10, 500, 20000]).to_bytes()  # the deltas take 1, 2 and 3 bytes
+    with pytest.raises(ValueError):
+        Replay.from_bytes(data[:length])
@@ -0,0 +1,72 @@
+import os
+import tracemalloc
+
+import pytest
+
+from config import Config
+from simulation import Simulation, DifficultyCurve
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ONLY_REPO = [tracemalloc.Filter(True, os.path.join(ROOT, "*"))]
+TICK_PEAK_LIMIT = 512  # bytes a tick may have allocated at once; a tick takes up to about 220
+
+
+def play(simulation, ticks):
+    """Jump whenever the nearest obstacle is close, the same policy bench_allocations uses"""
+    obstacles = simulation.get_obstacles()
+    for _ in range(ticks):
+        if obstacles[0].get_rect().x < 320:
+            simulation.jump()
+        simulation.step()
+
+
+def level_simulation(theme):
+    """Return a simulation held on its first level, after enough ticks to build its jump arc.
+
+    A level up replaces speed, gravity and every obstacle x with new floats and builds the jump arc of the
+    new gravity once, so the level is held fixed at a fractional speed to look at what step() does per tick.
+    """
+    simulation = Simulation(theme, curve=DifficultyCurve(points_per_level=10 ** 9, start_speed=5.5))
+    play(simulation, 500)
+    return simulation
+
+
+def traced_size():
+    return sum(stat.size for stat in tracemalloc.take_snapshot().filter_traces(ONLY_REPO).statistics("filename"))
+
+
+@pytest.mark.parametrize("theme", list(Config.THEME_ID))
+def test_step_memory_does_not_grow(theme):
+    # Not zero allocations: a tick still makes a few short-lived floats, see the next test. What it keeps
+    # is checked in total, as freed tuples and floats stay traced to their line while Python reuses them
+    simulation = level_simulation(theme)
+    tracemalloc.start()
+    try:
+        # The first traced ticks swap untraced state values for traced ones, so measure after them
+        play(simulation, 500)
+        before = traced_size()
+        play(simulation, 5000)
+        growth = traced_size() - before
+    finally:
+        tracemalloc.stop()
+
+    assert not simulation.is_over()
+    assert growth < 1024, f"5000 ticks kept {growth} B"  # one object kept per tick would be 80 kB
+
+
+@pytest.mark.parametrize("theme", list(Config.THEME_ID))
+def test_step_allocates_little_per_tick(theme):
+    simulation = level_simulation(theme)
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(5000):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            play(simulation, 1)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+
+    assert not simulation.is_over()
+    assert max(peaks) <= TICK_PEAK_LIMIT, f"a tick allocated {max(peaks)} B at once"
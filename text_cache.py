@@ -0,0 +1,54 @@
+from collections import OrderedDict
+import pygame as pg
+from config import Config
+
+
+class FontRegistry:
+    def __init__(self):
+        self.__fonts = {}
+
+    def get(self, size):
+        """Return the default font at size, constructing it only once"""
+        if size not in self.__fonts:
+            self.__fonts[size] = pg.font.Font(None, size)
+        return self.__fonts[size]
+
+
+class TextCache:
+    def __init__(self, max_size=Config.TEXT_CACHE_SIZE):
+        self.__fonts = FontRegistry()
+        self.__max_size = max_size
+        self.__cache = OrderedDict()  # (text, size, colour) -> Surface
+
+    def render(self, text, size, colour):
+        """Return the rendered text surface, rasterising it only on a cache miss"""
+        key = (text, size, colour)
+        surface = self.__cache.get(key)
+        if surface is not None:
+            self.__cache.move_to_end(key)
+            return surface
+
+        surface = self.__fonts.get(size).render(text, True, colour)
+        self.__cache[key] = surface
+        if len(self.__cache) > self.__max_size:
+            self.__cache.popitem(last=False)
+        return surface
+
+    def draw_value(self, screen, label, value, pos, size, colour):
+        """Draw 'label value' at pos from cached label and digit glyphs, return the covered rect"""
+        x, y = pos
+        label_surface = self.render(label, size, colour)
+        screen.blit(label_surface, (x, y))
+        x += label_surface.get_width()
+        height = label_surface.get_height()
+
+        for char in str(value):
+            glyph = self.render(char, size, colour)
+            screen.blit(glyph, (x, y))
+            x += glyph.get_width()
+            height = max(height, glyph.get_height())
+        return pg.Rect(pos[0], y, x - pos[0], height)
+
+    def clear(self):
+        """Remove every rendered surface from the cache"""
+        self.__cache.clear()
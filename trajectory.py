@@ -0,0 +1,101 @@
+import math
+import numpy as np
+from config import Config
+
+
+class JumpArc:
+    __arcs = {}
+
+    def __init__(self, ground_y, gravity, velocity=Config.JUMP_VELOCITY):
+        """The whole jump from ground_y at one gravity, integrated once exactly as Runner used to per tick"""
+        if gravity <= 0 or velocity >= 0:
+            raise ValueError("A jump needs an upward velocity and a positive gravity")
+        self.__ground_y = ground_y
+        self.__gravity = gravity
+        y, v = ground_y, velocity
+        heights = [y]
+        velocities = [v]
+        while True:
+            y += v
+            v += gravity
+            if y >= ground_y:
+                break
+            heights.append(y)
+            velocities.append(v)
+        self.__airtime = len(heights)
+        heights.append(ground_y)
+        velocities.append(0)
+        self.__heights = heights  # y after each tick of the jump, back on the ground at the airtime
+        self.__velocities = velocities
+        self.__height_array = np.array(heights, dtype=np.float64)
+        self.__apex_tick = min(range(len(heights)), key=heights.__getitem__)
+
+    @staticmethod
+    def get(ground_y, gravity):
+        """Return the arc for a runner standing at ground_y, building each table only once"""
+        key = (ground_y, gravity)
+        arc = JumpArc.__arcs.get(key)
+        if arc is None:
+            arc = JumpArc.__arcs[key] = JumpArc(ground_y, gravity)
+        return arc
+
+    def get_gravity(self):
+        return self.__gravity
+
+    def get_heights(self):
+        """Return y after each tick of the jump, indexed from 0 at the press to the airtime"""
+        return self.__heights
+
+    def get_height_array(self):
+        return self.__height_array
+
+    def get_velocity(self, tick):
+        """Return the velocity after tick ticks of the jump"""
+        return self.__velocities[tick]
+
+    def get_airtime(self):
+        """Return the tick on which the runner is back on the ground"""
+        return self.__airtime
+
+    def get_apex(self):
+        """Return the tick and y of the highest point of the jump"""
+        return self.__apex_tick, self.__heights[self.__apex_tick]
+
+    def height(self, tick):
+        """Return y after tick ticks of the jump, the ground once it has landed"""
+        return self.__heights[min(tick, self.__airtime)]
+
+    def will_clear(self, runner_rect, obstacle_rect, step, obstacle_x=None):
+        """Return True if a jump pressed now gets past the obstacle without touching it.
+
+        step is how far the obstacle moves each tick (speed + level), assumed constant for the
+        whole jump; obstacle_x is its exact position when it is not a whole number.
+        """
+        first, last = alongside_ticks(obstacle_rect.x if obstacle_x is None else obstacle_x,
+                                      obstacle_rect.width, runner_rect.left, runner_rect.right, step)
+        if last < first:
+            return True
+        # The arc rises then falls, so its lowest point over a window is at one of the ends
+        lowest = max(self.height(first), self.height(last))
+        return int(lowest) + runner_rect.height <= obstacle_rect.top
+
+
+def alongside_ticks(x, width, left, right, step):
+    """Return the first and last tick, counted from 1, on which an obstacle at x moving left by step
+    per tick overlaps the columns left to right; last < first when it never does"""
+    if step <= 0:
+        raise ValueError("The obstacle must move left")
+
+    # Estimate both ends, then correct the rounding of the estimate against the exact test,
+    # truncating the obstacle's left edge like the pg.Rect constructor
+    first = max(1, math.floor((x - right) / step) + 1)
+    while first > 1 and int(x - (first - 1) * step) < right:
+        first -= 1
+    while int(x - first * step) >= right:
+        first += 1
+    last = max(first - 1, math.ceil((x + width - left) / step) - 1)
+    while int(x - (last + 1) * step) + width > left:
+        last += 1
+    while last >= first and int(x - last * step) + width <= left:
+        last -= 1
+    return first, last
@@ -0,0 +1,126 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from config import Config
+from autopilot import Autopilot
+from simulation import Simulation, DifficultyCurve
+
+
+def play_chunk(task):
+    """Play a chunk of seeded games of one curve and theme with the autopilot, return the survival times"""
+    curve, theme, seeds, max_ticks, reaction = task
+    times = []
+    for seed in seeds:
+        simulation = Simulation(theme, seed, curve=curve)
+        Autopilot(random.Random(seed), reaction).play(simulation, max_ticks)
+        times.append(simulation.elapsed_time())
+    return times
+
+
+def percentile(ordered, fraction):
+    return ordered[round((len(ordered) - 1) * fraction)]
+
+
+def summarise(times, max_seconds):
+    """Return the survival time distribution of one curve and theme"""
+    ordered = sorted(times)
+    return {"p10": percentile(ordered, 0.10),
+            "p50": percentile(ordered, 0.50),
+            "p90": percentile(ordered, 0.90),
+            "survived": sum(t >= max_seconds for t in ordered) / len(ordered)}
+
+
+def tune(curves, games, max_seconds, reaction, workers, chunk):
+    """Play games seeded playthroughs per theme for every curve over a process pool.
+
+    Return {curve index: {theme: distribution}}.
+    """
+    max_ticks = int(max_seconds * Config.TICK_RATE)
+    tasks = []
+    for index, curve in enumerate(curves):
+        for theme in Config.THEME_ID:
+            for start in range(0, games, chunk):
+                tasks.append((index, (curve, theme, range(start, min(start + chunk, games)), max_ticks, reaction)))
+
+    times = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for (index, task), result in zip(tasks, executor.map(play_chunk, [task for _, task in tasks])):
+            times.setdefault((index, task[1]), []).extend(result)
+
+    return {index: {theme: summarise(times[(index, theme)], max_seconds) for theme in Config.THEME_ID}
+            for index in range(len(curves))}
+
+
+def rank(curves, summaries, target):
+    """Return (error, curve, per-theme distributions) sorted by how far the median survival of
+    each theme is from target seconds, on average"""
+    rows = []
+    for index, curve in enumerate(curves):
+        by_theme = summaries[index]
+        error = sum(abs(stats["p50"] - target) for stats in by_theme.values()) / len(by_theme) / target
+        rows.append((error, curve, by_theme))
+    rows.sort(key=lambda row: row[0])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank difficulty curves by autopilot survival time")
+    parser.add_argument("--games", type=int, default=300, help="playthroughs per theme and curve")
+    parser.add_argument("--target", type=float, default=60, help="median survival time to aim for, in seconds")
+    parser.add_argument("--max-seconds", type=float, default=180, help="stop a playthrough that survives this long")
+    parser.add_argument("--points", type=int, nargs="+", default=[10], help="points per level")
+    parser.add_argument("--speed-steps", type=float, nargs="+", default=[0.25, 0.5, 0.75])
+    parser.add_argument("--gravity-steps", type=float, nargs="+", default=[0.02, 0.04, 0.06])
+    parser.add_argument("--level-caps", type=int, nargs="+", default=[5, 7, 10])
+    parser.add_argument("--reaction", type=int, nargs=2, default=[0, 15], metavar=("LOW", "HIGH"),
+                        help="autopilot reaction time range in ticks")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--chunk", type=int, default=25, help="playthroughs per task sent to a worker")
+    parser.add_argument("--output", help="also write the ranked table to this CSV file")
+    args = parser.parse_args()
+
+    curves = [DifficultyCurve(points, speed_step, gravity_step, level_cap)
+              for points, speed_step, gravity_step, level_cap
+              in itertools.product(args.points, args.speed_steps, args.gravity_steps, args.level_caps)]
+    total = len(curves) * len(Config.THEME_ID) * args.games
+    print(f"Playing {total} games of {len(curves)} curves on {args.workers} worker(s)")
+
+    start = time.perf_counter()
+    summaries = tune(curves, args.games, args.max_seconds, tuple(args.reaction), args.workers, args.chunk)
+    rows = rank(curves, summaries, args.target)
+    elapsed = time.perf_counter() - start
+
+    themes = list(Config.THEME_ID)
+    print(f"{'rank':>4} {'error':>6}  {'pts':>3} {'speed':>5} {'grav':>5} {'cap':>3}  "
+          + "  ".join(f"{theme + ' p10/p50/p90 (s)':>28}" for theme in themes))
+    for position, (error, curve, by_theme) in enumerate(rows, 1):
+        cells = "  ".join(f"{s['p10']:8.1f} {s['p50']:8.1f} {s['p90']:8.1f}  "
+                          for s in (by_theme[theme] for theme in themes))
+        print(f"{position:>4} {error:6.1%}  {curve.points_per_level:>3} {curve.speed_step:>5} "
+              f"{curve.gravity_step:>5} {curve.level_cap:>3}  {cells}")
+    print(f"{total} games in {elapsed:.1f} s ({total / elapsed:,.0f} games/s)")
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["rank", "error", "points_per_level", "speed_step", "gravity_step", "level_cap"]
+                            + [f"{theme} {column}" for theme in themes for column in ("p10", "p50", "p90", "survived")])
+            for position, (error, curve, by_theme) in enumerate(rows, 1):
+                writer.writerow([position, round(error, 4), curve.points_per_level, curve.speed_step,
+                                 curve.gravity_step, curve.level_cap]
+                                + [round(by_theme[theme][column], 2) for theme in themes
+                                   for column in ("p10", "p50", "p90", "survived")])
+        print(f"Ranked curves written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())